@@ -1,6 +1,9 @@
 from decimal import Decimal
 from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
 from django.db import transaction as dbtx
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
@@ -44,6 +47,18 @@ class EntryLineInline(admin.TabularInline):
 
 
 # ---------- Transaction ----------
+TOTALS_VAR = "totals"
+
+
+class TotalsChangeList(ChangeList):
+    """Keeps ?totals=1 in the sort/filter/page links but never filters on it."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(TOTALS_VAR, None)
+        return lookup_params
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     inlines = [EntryLineInline]
@@ -54,14 +69,21 @@ class TransactionAdmin(admin.ModelAdmin):
         "journal",
         "memo",
         "posted_badge",
-        "debit_total",
-        "credit_total",
     )
     list_filter = ("posted", "journal")
+    list_select_related = ("journal",)
     search_fields = ("memo", "lines__description", "journal__name")
     autocomplete_fields = ("journal",)
-    readonly_fields = ("created_at", "posted")
-    fields = ("journal", "tx_date", "memo", "posted", "created_at")
+    readonly_fields = ("created_at", "posted", "debit_total", "credit_total")
+    fields = (
+        "journal",
+        "tx_date",
+        "memo",
+        "posted",
+        "created_at",
+        "debit_total",
+        "credit_total",
+    )
 
     def posted_badge(self, obj):
         color = "#22c55e" if obj.posted else "#ef4444"
@@ -74,17 +96,43 @@ class TransactionAdmin(admin.ModelAdmin):
 
     posted_badge.short_description = "Status"
 
+    # Σ columns cost an aggregate per row, so the changelist only shows them
+    # with ?totals=1; the change form always does.
+    def changelist_view(self, request, extra_context=None):
+        request._with_totals = request.GET.get(TOTALS_VAR) == "1"
+        return super().changelist_view(request, extra_context)
+
+    def get_changelist(self, request, **kwargs):
+        return TotalsChangeList
+
+    def get_list_display(self, request):
+        list_display = super().get_list_display(request)
+        if getattr(request, "_with_totals", False):
+            list_display = (*list_display, "debit_total", "credit_total")
+        return list_display
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request).select_related("journal")
+        if getattr(request, "_with_totals", True):
+            # Totals are aggregated by the database in the same SELECT
+            qs = qs.annotate(
+                _debit_total=Coalesce(Sum("lines__debit"), Decimal("0.00")),
+                _credit_total=Coalesce(Sum("lines__credit"), Decimal("0.00")),
+            )
+        return qs
+
     def debit_total(self, obj):
-        q = obj.lines.all()
-        return sum((l.debit for l in q), Decimal("0.00"))
+        # unsaved (add form) instances have no annotation
+        return getattr(obj, "_debit_total", Decimal("0.00"))
 
     debit_total.short_description = "Σ Debit"
+    debit_total.admin_order_field = "_debit_total"
 
     def credit_total(self, obj):
-        q = obj.lines.all()
-        return sum((l.credit for l in q), Decimal("0.00"))
+        return getattr(obj, "_credit_total", Decimal("0.00"))
 
     credit_total.short_description = "Σ Credit"
+    credit_total.admin_order_field = "_credit_total"
 
     # Prevent edits on posted transactions
     def get_readonly_fields(self, request, obj=None):
@@ -106,20 +154,22 @@ class TransactionAdmin(admin.ModelAdmin):
     @admin.action(description="Post selected balanced transactions")
     def action_post(self, request, queryset):
         count = 0
-        for tx in queryset.select_related("journal"):
-            if tx.posted:
-                continue
-            # Validate inline formset already guarantees balance in UI,
-            # but when posting from action, re-check using model clean()
-            try:
-                with dbtx.atomic():
-                    tx.full_clean()
-                    tx.post()
-                count += 1
-            except Exception as e:
-                self.message_user(
-                    request, f"Tx {tx.pk} not posted: {e}", level=messages.ERROR
-                )
+        # One commit for the whole selection; the inner atomic() is a
+        # savepoint so a failing transaction only rolls back itself.
+        with dbtx.atomic():
+            for tx in queryset.select_related("journal"):
+                if tx.posted:
+                    continue
+                # Validate inline formset already guarantees balance in UI,
+                # but when posting from action, post() re-checks via clean()
+                try:
+                    with dbtx.atomic():
+                        tx.post()
+                    count += 1
+                except Exception as e:
+                    self.message_user(
+                        request, f"Tx {tx.pk} not posted: {e}", level=messages.ERROR
+                    )
         if count:
             self.message_user(
                 request, f"Posted {count} transaction(s).", level=messages.SUCCESS
@@ -137,37 +187,41 @@ class TransactionAdmin(admin.ModelAdmin):
     def action_reverse_transaction(self, request, queryset):
         """Creates same-dated reversing transactions in the same journal."""
         created = 0
-        for tx in queryset:
-            if not tx.posted:
-                self.message_user(
-                    request,
-                    f"Tx {tx.pk} is not posted; skipping.",
-                    level=messages.WARNING,
-                )
-                continue
-            try:
-                with dbtx.atomic():
-                    lines = []
-                    for l in tx.lines.all():
-                        lines.append(
-                            {
-                                "account": l.account,
-                                "debit": l.credit,  # swap
-                                "credit": l.debit,
-                                "description": f"Reversal of Tx {tx.pk}: {l.description or ''}",
-                            }
+        # Single commit, one savepoint per reversal (see action_post)
+        with dbtx.atomic():
+            for tx in queryset.select_related("journal"):
+                if not tx.posted:
+                    self.message_user(
+                        request,
+                        f"Tx {tx.pk} is not posted; skipping.",
+                        level=messages.WARNING,
+                    )
+                    continue
+                try:
+                    with dbtx.atomic():
+                        lines = []
+                        for l in tx.lines.select_related("account"):
+                            lines.append(
+                                {
+                                    "account": l.account,
+                                    "debit": l.credit,  # swap
+                                    "credit": l.debit,
+                                    "description": f"Reversal of Tx {tx.pk}: {l.description or ''}",
+                                }
+                            )
+                        rev = create_and_post_transaction(
+                            journal=tx.journal,
+                            tx_date=tx.tx_date,
+                            memo=f"Reversal of Tx {tx.pk}",
+                            lines=lines,
                         )
-                    rev = create_and_post_transaction(
-                        journal=tx.journal,
-                        tx_date=tx.tx_date,
-                        memo=f"Reversal of Tx {tx.pk}",
-                        lines=lines,
+                        created += 1
+                except Exception as e:
+                    self.message_user(
+                        request,
+                        f"Failed reversing Tx {tx.pk}: {e}",
+                        level=messages.ERROR,
                     )
-                    created += 1
-            except Exception as e:
-                self.message_user(
-                    request, f"Failed reversing Tx {tx.pk}: {e}", level=messages.ERROR
-                )
         if created:
             self.message_user(
                 request,
@@ -0,0 +1,71 @@
+"""
+Shared ledger version for caching derived data such as reports.
+
+The version lives in Django's cache (shared between workers when CACHES
+points at redis/memcached) and changes on every write that can alter a
+report; callers put it in their cache keys instead of clearing entries.
+Closed months (`Balance` totals) are derived data too and are reopened when
+lines of a posted transaction change.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction as dbtx
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Account, ClosedPeriod, EntryLine, Transaction
+
+LEDGER_VERSION_KEY = "accounting:ledger-version"
+
+
+def ledger_version() -> int:
+    version = cache.get(LEDGER_VERSION_KEY)
+    if version is None:
+        # Start from the clock, not 1, so a lost key never reuses old versions
+        cache.add(LEDGER_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(LEDGER_VERSION_KEY)
+    return version
+
+
+def _incr_ledger_version():
+    try:
+        cache.incr(LEDGER_VERSION_KEY)
+    except ValueError:  # key missing
+        cache.add(LEDGER_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_ledger_version():
+    """
+    Call after writing ledger data. Bumps now and again once the database
+    transaction commits, so a reader that cached the pre-commit state in
+    between is not served afterwards.
+    """
+    _incr_ledger_version()
+    dbtx.on_commit(_incr_ledger_version)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=EntryLine)
+@receiver(post_delete, sender=EntryLine)
+def _ledger_changed(sender, **kwargs):
+    # Posting always saves the Transaction, which also covers lines that were
+    # written with bulk_create; the bulk service bumps the version itself.
+    # Account renames change report rows too.
+    bump_ledger_version()
+
+
+@receiver(post_save, sender=EntryLine)
+@receiver(post_delete, sender=EntryLine)
+def _reopen_closed_months(sender, instance, **kwargs):
+    # Lines edited or deleted after posting (e.g. in the admin inline) would
+    # leave stale Balance rows; post() and the bulk service write lines with
+    # bulk_create, which sends no signal, and reopen on their own.
+    posted = Transaction.objects.filter(pk=instance.transaction_id, posted=True)
+    tx_date = posted.values_list("tx_date", flat=True).first()
+    if tx_date is not None:
+        ClosedPeriod.reopen_from(tx_date)
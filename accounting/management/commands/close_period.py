@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from django.db.models import Max, Min
+from accounting.models import ClosedPeriod, Transaction
+from accounting.services import close_period, next_month
+
+
+def _month(s: str) -> date:
+    try:
+        return date.fromisoformat(f"{s}-01")
+    except ValueError:
+        raise CommandError(f"Invalid month {s!r}, expected YYYY-MM")
+
+
+class Command(BaseCommand):
+    help = (
+        "Materialize monthly per-account totals into Balance so reports only "
+        "scan raw entry lines for the still-open months"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--through",
+            help="Last month to close, YYYY-MM (default: previous month)",
+        )
+        parser.add_argument(
+            "--from",
+            dest="start",
+            help="First month to (re)close, YYYY-MM (default: the month after the "
+            "last closed one, or the month of the first posted transaction)",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["through"]:
+            through = _month(opts["through"])
+        else:
+            through = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+
+        if opts["start"]:
+            month = _month(opts["start"])
+        else:
+            # Close months contiguously: reports read Balance up to the last
+            # closed month, so skipping one would drop its activity.
+            last = ClosedPeriod.objects.aggregate(p=Max("period"))["p"]
+            if last is not None:
+                month = next_month(last)
+            else:
+                first = Transaction.objects.filter(posted=True).aggregate(
+                    d=Min("tx_date")
+                )["d"]
+                if first is None:
+                    self.stdout.write(
+                        self.style.WARNING("No posted transactions. Nothing to close.")
+                    )
+                    return
+                month = first.replace(day=1)
+
+        closed = 0
+        while month <= through:
+            try:
+                rows = close_period(month)
+            except ValidationError as e:
+                raise CommandError(" ".join(e.messages))
+            self.stdout.write(f"{month:%Y-%m}: {rows} account balance(s)")
+            closed += 1
+            month = next_month(month)
+
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} period(s)."))
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from accounting.models import Account, AccountType
 
 BASICS = [
@@ -19,8 +20,11 @@ BASICS = [
 
 class Command(BaseCommand):
     def handle(self, *args, **kwargs):
-        for code, name, typ, nd in BASICS:
-            Account.objects.get_or_create(
-                code=code, defaults={"name": name, "type": typ, "normal_debit": nd}
-            )
+        objs = [
+            Account(code=code, name=name, type=typ, normal_debit=nd)
+            for code, name, typ, nd in BASICS
+        ]
+        # One INSERT, one commit; existing codes are left untouched
+        with transaction.atomic():
+            Account.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS("Seeded Chart of Accounts."))
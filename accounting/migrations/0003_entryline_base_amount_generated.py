@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2025-09-02 10:21
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0002_alter_journal_description"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="entryline",
+            name="base_amount",
+        ),
+        migrations.AddField(
+            model_name="entryline",
+            name="base_amount",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.CombinedExpression(
+                    models.F("debit"), "-", models.F("credit")
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=18),
+            ),
+        ),
+    ]
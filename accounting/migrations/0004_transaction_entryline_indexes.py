@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2025-09-02 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0003_entryline_base_amount_generated"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["posted", "tx_date"], name="tx_posted_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="entryline",
+            index=models.Index(
+                fields=["transaction", "account"], name="entry_tx_acct_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2025-09-12 09:40
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def closed_prefix(apps, schema_editor):
+    """
+    Record the months already closed into Balance. Only the contiguous run
+    from the earliest one counts, and only if nothing was posted before it;
+    other Balance rows are dropped and can be rebuilt with close_period.
+    """
+    Balance = apps.get_model("accounting", "Balance")
+    ClosedPeriod = apps.get_model("accounting", "ClosedPeriod")
+    Transaction = apps.get_model("accounting", "Transaction")
+
+    periods = sorted(set(Balance.objects.values_list("period", flat=True)))
+    keep = []
+    if (
+        periods
+        and not Transaction.objects.filter(posted=True, tx_date__lt=periods[0]).exists()
+    ):
+        for p in periods:
+            # periods are first-of-month, so +32 days lands in the next month
+            if keep and p != (keep[-1] + timedelta(days=32)).replace(day=1):
+                break
+            keep.append(p)
+    ClosedPeriod.objects.bulk_create([ClosedPeriod(period=p) for p in keep])
+    Balance.objects.exclude(period__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0004_transaction_entryline_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClosedPeriod",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField(unique=True)),
+                ("closed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["period"],
+            },
+        ),
+        migrations.RunPython(closed_prefix, migrations.RunPython.noop),
+    ]
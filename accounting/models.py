@@ -3,6 +3,21 @@ from django.core.exceptions import ValidationError
 from django.db import models, transaction as dbtx
 from django.utils import timezone
 
+CENT = Decimal("0.01")
+
+
+def _to_cents(v) -> int:
+    """Money amount (2 decimal places) as integer cents; None/0 -> 0."""
+    if not v:
+        return 0
+    if type(v) is not Decimal:
+        v = Decimal(v)
+    return int(v.quantize(CENT).scaleb(2))
+
+
+def _from_cents(c: int) -> Decimal:
+    return Decimal(c).scaleb(-2)
+
 
 class AccountType(models.TextChoices):
     ASSET = "ASSET", "Asset"
@@ -46,25 +61,47 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     posted = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Reports filter on posted=True and a tx_date range
+            models.Index(fields=["posted", "tx_date"], name="tx_posted_date_idx"),
+        ]
+
     def clean(self):
-        lines = list(self.lines.all())
+        self._validate_lines(self.lines.all())
+
+    def _validate_lines(self, lines):
+        """Check the double-entry invariants on any iterable of lines.
+
+        Lets callers that just built the lines in memory validate them
+        without re-reading them from the database.
+        """
+        lines = list(lines)
         if len(lines) < 2:
             raise ValidationError("A transaction must have at least two lines.")
-        deb = sum((l.debit for l in lines), Decimal("0.00"))
-        cred = sum((l.credit for l in lines), Decimal("0.00"))
+        # Balance check on integer cents in one pass; Decimal only for the message
+        deb = cred = 0
+        for l in lines:
+            deb += _to_cents(l.debit)
+            cred += _to_cents(l.credit)
         if deb != cred:
             raise ValidationError(
-                f"Unbalanced transaction: debits {deb} != credits {cred}"
+                f"Unbalanced transaction: debits {_from_cents(deb)} != credits {_from_cents(cred)}"
             )
 
-    def post(self):
-        from django.db.models import F
-
+    def post(self, *, validate=True):
+        """
+        Mark the transaction posted. `validate=False` is for trusted callers
+        (e.g. services.create_and_post_transaction) that already checked
+        the lines in memory and would otherwise pay for a second pass.
+        """
         with dbtx.atomic():
-            self.full_clean()
+            if validate:
+                self.full_clean()
             self.posted = True
             self.save(update_fields=["posted"])
-            # Optionally update running balances table here (see Balance model below)
+            # Totals of a closed month no longer include this transaction
+            ClosedPeriod.reopen_from(self.tx_date)
 
 
 class EntryLine(models.Model):
@@ -83,11 +120,18 @@ class EntryLine(models.Model):
     )
     description = models.CharField(max_length=255, blank=True)
     currency = models.CharField(max_length=3, default="EUR")
-    base_amount = models.DecimalField(
-        max_digits=18, decimal_places=2, default=Decimal("0.00")
-    )  # +/- signed
+    # Signed amount for quick aggregation (debits positive, credits negative),
+    # maintained by the database as a stored generated column
+    base_amount = models.GeneratedField(
+        expression=models.F("debit") - models.F("credit"),
+        output_field=models.DecimalField(max_digits=18, decimal_places=2),
+        db_persist=True,
+    )
 
     class Meta:
+        indexes = [
+            models.Index(fields=["transaction", "account"], name="entry_tx_acct_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=~(models.Q(debit__gt=0) & models.Q(credit__gt=0)),
@@ -102,15 +146,6 @@ class EntryLine(models.Model):
     def clean(self):
         if (self.debit == 0) and (self.credit == 0):
             raise ValidationError("Line must have either debit or credit > 0.")
-        # Base amount signed for quick aggregation (debits positive, credits negative)
-        self.base_amount = self.debit - self.credit
-
-    def save(self, *args, **kwargs):
-        # Ensure base_amount always consistent even if full_clean not called upstream
-        self.base_amount = (self.debit or Decimal("0.00")) - (
-            self.credit or Decimal("0.00")
-        )
-        super().save(*args, **kwargs)
 
 
 # (Optional) Denormalized balances for fast reports
@@ -126,3 +161,31 @@ class Balance(models.Model):
 
     class Meta:
         unique_together = [("account", "period")]
+
+
+class ClosedPeriod(models.Model):
+    """
+    A month whose totals are materialized in `Balance` (services.close_period).
+
+    Reports only trust Balance for the contiguous run of closed months, so a
+    posting dated in a closed month reopens it and every later month.
+    """
+
+    period = models.DateField(unique=True)  # first day of month
+    closed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["period"]
+
+    def __str__(self):
+        return f"{self.period:%Y-%m}"
+
+    @classmethod
+    def reopen_from(cls, d) -> None:
+        """Drop the closed months (and their Balance rows) from `d`'s month on."""
+        month = d.replace(day=1)
+        if not cls.objects.filter(period__gte=month).exists():
+            return
+        with dbtx.atomic():
+            Balance.objects.filter(period__gte=month).delete()
+            cls.objects.filter(period__gte=month).delete()
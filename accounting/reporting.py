@@ -3,7 +3,9 @@
 This module provides simple reporting functions built on the posted
 `EntryLine` data: an income statement (profit & loss) over a date range and
 a balance sheet snapshot at a point in time. Values are returned as plain
-Python dictionaries suitable for JSON serialization by the API layer.
+Python dictionaries suitable for JSON serialization by the API layer, or,
+when a file-like `writer` is passed, streamed to it as JSON so the row
+lists are never materialized.
 
 Notes:
 - `amount_base` is the raw sum of (debit - credit) for an account.
@@ -14,12 +16,25 @@ Notes:
 """
 
 from __future__ import annotations
+import json
+from collections.abc import Iterator
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict, Iterable, Tuple
+from itertools import chain
+from typing import Dict, Iterable, TextIO
 
-from accounting.models import EntryLine, Account, AccountType
+from django.db.models import F, Sum
+
+from accounting.models import (
+    CENT,
+    Account,
+    AccountType,
+    Balance,
+    ClosedPeriod,
+    EntryLine,
+)
+from accounting.services import next_month
 
 
 @dataclass
@@ -29,61 +44,151 @@ class LineSum:
     account_name: str
     type: str  # AccountType value
     normal_debit: bool
-    amount_base: Decimal  # sum(debit - credit) in base currency (your EntryLine fields)
+    amount_base: Decimal  # sum(base_amount), i.e. sum(debit - credit), in base currency
     display: Decimal  # amount as humans expect (normal balance logic)
+    display_str: str  # str(display), formatted once per account
+
+
+def _line_sums(rows: Iterable[dict]) -> Dict[int, LineSum]:
+    """
+    Build LineSums from `account_id`/`amount_base` rows; several rows for the
+    same account are added together.
+
+    The rows carry no account columns: code/name/type are decorated from one
+    small Account lookup, iterated in code order so the dict (and every list
+    built from it) is already in presentation order.
+    """
+    totals: Dict[int, Decimal] = {}
+    for r in rows:
+        # SQLite returns SUM() without the column's scale; keep two places
+        base = (r["amount_base"] or Decimal("0")).quantize(CENT)
+        totals[r["account_id"]] = totals.get(r["account_id"], Decimal("0")) + base
+
+    sums: Dict[int, LineSum] = {}
+    accounts = Account.objects.values_list(
+        "id", "code", "name", "type", "normal_debit"
+    ).order_by("code")
+    for acc_id, code, name, type_, normal_debit in accounts:
+        if acc_id not in totals:
+            continue
+        base = totals[acc_id]
+        # display using normal balance; unary plus folds -0.00 into 0.00
+        display = +base if normal_debit else -base
+        sums[acc_id] = LineSum(
+            account_id=acc_id,
+            account_code=code,
+            account_name=name,
+            type=type_,
+            normal_debit=normal_debit,
+            amount_base=base,
+            display=display,
+            display_str=str(display),
+        )
+    return sums
 
 
-def _iter_lines(*, start: date | None, end: date) -> Iterable[EntryLine]:
-    qs = EntryLine.objects.select_related("account", "transaction").filter(
+def _line_rows(*, start: date | None, end: date):
+    qs = EntryLine.objects.filter(
         transaction__posted=True, transaction__tx_date__lte=end
     )
     if start is not None:
         qs = qs.filter(transaction__tx_date__gte=start)
-    return qs
+    # GROUP BY the integer FK only; no join to accounts
+    return qs.values("account_id").annotate(amount_base=Sum("base_amount")).order_by()
 
 
-def _accumulate(lines: Iterable[EntryLine]) -> Dict[int, LineSum]:
-    sums: Dict[int, LineSum] = {}
-    for l in lines:
-        acc = l.account
-        base = (l.debit or Decimal("0")) - (l.credit or Decimal("0"))
-        cur = sums.get(acc.id)
-        if cur is None:
-            cur = LineSum(
-                account_id=acc.id,
-                account_code=acc.code,
-                account_name=acc.name,
-                type=acc.type,
-                normal_debit=acc.normal_debit,
-                amount_base=Decimal("0"),
-                display=Decimal("0"),
-            )
-            sums[acc.id] = cur
-        cur.amount_base += base
-    # compute display using normal balance
-    for s in sums.values():
-        s.display = s.amount_base if s.normal_debit else -s.amount_base
-    return sums
+def _aggregate(*, start: date | None, end: date) -> Dict[int, LineSum]:
+    """
+    Sum (debit - credit) per account for posted lines in `start`..`end`.
+
+    The reduction runs as a single GROUP BY in the database, so the result
+    size is proportional to the number of accounts rather than lines.
+    """
+    return _line_sums(_line_rows(start=start, end=end).iterator(chunk_size=2000))
 
 
-def _sum_base(lines: Iterable[EntryLine]) -> Dict[int, Tuple[Account, Decimal]]:
+def _cumulative(*, as_of: date) -> Dict[int, LineSum]:
     """
-    Sum base amounts (debit - credit) per account, return {account_id: (Account, amount_base)}.
-    This is *not* normal-balance adjusted — trial balance uses raw debit/credit sign.
+    Cumulative per-account sums up to `as_of`.
+
+    Months materialized by `services.close_period` are read from `Balance`,
+    but only the contiguous run of closed months from the first one; posted
+    lines before and after that run are aggregated from `EntryLine`. Without
+    any closed month this is `_aggregate(start=None)`.
+    """
+    first = closed_through = None
+    periods = ClosedPeriod.objects.filter(period__lt=as_of.replace(day=1))
+    for p in periods.values_list("period", flat=True).order_by("period"):
+        if closed_through is not None and p != next_month(closed_through):
+            break  # a gap: later closed months cannot be combined with it
+        first = first or p
+        closed_through = p
+    if closed_through is None:
+        return _aggregate(start=None, end=as_of)
+
+    before = _line_rows(start=None, end=first - timedelta(days=1))
+    closed = (
+        Balance.objects.filter(period__gte=first, period__lte=closed_through)
+        .values("account_id")
+        .annotate(amount_base=Sum(F("debit_total") - F("credit_total")))
+        .order_by()
+    )
+    after = _line_rows(start=next_month(closed_through), end=as_of)
+    return _line_sums(
+        chain.from_iterable(
+            qs.iterator(chunk_size=2000) for qs in (before, closed, after)
+        )
+    )
+
+
+def _rows(sums: Iterable[LineSum]) -> Iterator[dict]:
+    for s in sums:
+        yield {"code": s.account_code, "name": s.account_name, "amount": s.display_str}
+
+
+def _iter_json(obj) -> Iterator[str]:
+    """Encode `obj` as JSON chunks; iterators are emitted as arrays lazily."""
+    if isinstance(obj, dict):
+        yield "{"
+        for i, (k, v) in enumerate(obj.items()):
+            yield (", " if i else "") + json.dumps(k) + ": "
+            yield from _iter_json(v)
+        yield "}"
+    elif isinstance(obj, (list, tuple, Iterator)):
+        yield "["
+        for i, v in enumerate(obj):
+            if i:
+                yield ", "
+            yield from _iter_json(v)
+        yield "]"
+    else:
+        yield json.dumps(obj)
+
+
+def _materialize(obj):
+    if isinstance(obj, dict):
+        return {k: _materialize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, Iterator)):
+        return [_materialize(v) for v in obj]
+    return obj
+
+
+def _emit(report: dict, writer: TextIO | None) -> dict | None:
+    """
+    Report sections are generators. Without a writer, build the plain dict;
+    with one, stream the report to it as JSON and return None.
     """
-    out: Dict[int, Tuple[Account, Decimal]] = {}
-    for l in lines:
-        acc = l.account
-        amt = (l.debit or Decimal("0")) - (l.credit or Decimal("0"))
-        if acc.id in out:
-            out[acc.id] = (acc, out[acc.id][1] + amt)
-        else:
-            out[acc.id] = (acc, amt)
-    return out
+    if writer is None:
+        return _materialize(report)
+    for chunk in _iter_json(report):
+        writer.write(chunk)
+    return None
 
 
 # ------------ Income Statement (P&L) ------------
-def income_statement(*, start: date, end: date) -> dict:
+def income_statement(
+    *, start: date, end: date, writer: TextIO | None = None
+) -> dict | None:
     """
     Produce an income statement (profit & loss) for the inclusive date range
     `start`..`end`.
@@ -99,10 +204,13 @@ def income_statement(*, start: date, end: date) -> dict:
       - `totals`: totals for income, expense and net_income
 
     Important: only posted transactions are considered.
+    If `writer` is given the same structure is written to it as JSON.
     """
+    return _emit(_income_statement(start=start, end=end), writer)
 
-    lines = _iter_lines(start=start, end=end)
-    sums = _accumulate(lines)
+
+def _income_statement(*, start: date, end: date) -> dict:
+    sums = _aggregate(start=start, end=end)
 
     inc = [s for s in sums.values() if s.type == AccountType.INCOME]
     exp = [s for s in sums.values() if s.type == AccountType.EXPENSE]
@@ -113,24 +221,18 @@ def income_statement(*, start: date, end: date) -> dict:
 
     return {
         "period": {"start": str(start), "end": str(end)},
-        "income": [
-            {"code": s.account_code, "name": s.account_name, "amount": str(+s.display)}
-            for s in sorted(inc, key=lambda x: x.account_code)
-        ],
-        "expenses": [
-            {"code": s.account_code, "name": s.account_name, "amount": str(+s.display)}
-            for s in sorted(exp, key=lambda x: x.account_code)
-        ],
+        "income": _rows(inc),
+        "expenses": _rows(exp),
         "totals": {
-            "income": str(+total_income),
-            "expense": str(+total_expense),
-            "net_income": str(+net_income),
+            "income": str(total_income),
+            "expense": str(total_expense),
+            "net_income": str(net_income),
         },
     }
 
 
 # ------------ Balance Sheet ------------
-def balance_sheet(*, as_of: date) -> dict:
+def balance_sheet(*, as_of: date, writer: TextIO | None = None) -> dict | None:
     """
     Produce a balance sheet snapshot as of the `as_of` date.
 
@@ -147,9 +249,14 @@ def balance_sheet(*, as_of: date) -> dict:
         True when Assets == Liabilities + Equity.
 
     Important: only posted transactions are considered.
+    If `writer` is given the same structure is written to it as JSON.
     """
+    return _emit(_balance_sheet(as_of=as_of), writer)
+
+
+def _balance_sheet(*, as_of: date) -> dict:
     # Cumulative up to as_of for all accounts
-    cumulative = _accumulate(_iter_lines(start=None, end=as_of))
+    cumulative = _cumulative(as_of=as_of)
 
     assets = [s for s in cumulative.values() if s.type == AccountType.ASSET]
     liabs = [s for s in cumulative.values() if s.type == AccountType.LIABILITY]
@@ -171,109 +278,105 @@ def balance_sheet(*, as_of: date) -> dict:
 
     return {
         "as_of": str(as_of),
-        "assets": [
-            {"code": s.account_code, "name": s.account_name, "amount": str(+s.display)}
-            for s in sorted(assets, key=lambda x: x.account_code)
-        ],
-        "liabilities": [
-            {"code": s.account_code, "name": s.account_name, "amount": str(+s.display)}
-            for s in sorted(liabs, key=lambda x: x.account_code)
-        ],
-        "equity": [
-            {"code": s.account_code, "name": s.account_name, "amount": str(+s.display)}
-            for s in sorted(equity, key=lambda x: x.account_code)
-        ]
-        + [{"code": "RETAINED", "name": "Retained Earnings", "amount": str(+retained)}],
+        "assets": _rows(assets),
+        "liabilities": _rows(liabs),
+        "equity": chain(
+            _rows(equity),
+            [
+                {
+                    "code": "RETAINED",
+                    "name": "Retained Earnings",
+                    "amount": str(retained),
+                }
+            ],
+        ),
         "totals": {
-            "assets": str(+total_assets),
-            "liabilities_plus_equity": str(+(total_liabs + total_equity)),
+            "assets": str(total_assets),
+            "liabilities_plus_equity": str(total_liabs + total_equity),
             "balanced": balance_ok,
         },
     }
 
 
 # ------------ Trial Balance Reports ------------
-def trial_balance_as_of(*, as_of: date) -> dict:
+def _trial_balance(sums: Dict[int, LineSum]) -> tuple[Iterator[dict], dict]:
+    """
+    Totals plus a lazy row generator. Rows use the raw debit/credit sign,
+    not the normal balance; zero-balance accounts are skipped.
+    """
+    nonzero = [s for s in sums.values() if s.amount_base != 0]
+    total_debits = sum(
+        (s.amount_base for s in nonzero if s.amount_base > 0), Decimal("0")
+    )
+    total_credits = -sum(
+        (s.amount_base for s in nonzero if s.amount_base < 0), Decimal("0")
+    )
+
+    def rows():
+        for s in nonzero:
+            base = s.amount_base
+            yield {
+                "code": s.account_code,
+                "name": s.account_name,
+                "debit": str(base if base > 0 else Decimal("0")),
+                "credit": str(-base if base < 0 else Decimal("0")),
+            }
+
+    totals = {
+        "debit": str(total_debits),
+        "credit": str(total_credits),
+        "balanced": (total_debits == total_credits),
+    }
+    return rows(), totals
+
+
+def trial_balance_as_of(*, as_of: date, writer: TextIO | None = None) -> dict | None:
     """
     Classic Trial Balance at a point in time:
     - Cumulative sums up to 'as_of'
     - Each account shows either a Debit or Credit balance (never both)
     """
-    sums = _sum_base(_iter_lines(start=None, end=as_of))
-    rows = []
-    total_debits = Decimal("0")
-    total_credits = Decimal("0")
+    return _emit(_trial_balance_as_of(as_of=as_of), writer)
 
-    for acc_id, (acc, base) in sorted(sums.items(), key=lambda kv: kv[1][0].code):
-        if base == 0:
-            continue
-        if base > 0:
-            debit = +base
-            credit = Decimal("0")
-            total_debits += debit
-        else:
-            debit = Decimal("0")
-            credit = +(-base)
-            total_credits += credit
-
-        rows.append(
-            {
-                "code": acc.code,
-                "name": acc.name,
-                "debit": str(debit),
-                "credit": str(credit),
-            }
-        )
 
-    return {
-        "as_of": str(as_of),
-        "rows": rows,
-        "totals": {
-            "debit": str(total_debits),
-            "credit": str(total_credits),
-            "balanced": (total_debits == total_credits),
-        },
-    }
+def _trial_balance_as_of(*, as_of: date) -> dict:
+    rows, totals = _trial_balance(_cumulative(as_of=as_of))
+    return {"as_of": str(as_of), "rows": rows, "totals": totals}
 
 
-def trial_balance_period(*, start: date, end: date) -> dict:
+def trial_balance_period(
+    *, start: date, end: date, writer: TextIO | None = None
+) -> dict | None:
     """
     Period Trial Balance (a.k.a. period movement trial balance):
     - Sums only lines within [start, end]
     - Useful to sanity-check that period debits == period credits
     """
-    sums = _sum_base(_iter_lines(start=start, end=end))
-    rows = []
-    total_debits = Decimal("0")
-    total_credits = Decimal("0")
+    return _emit(_trial_balance_period(start=start, end=end), writer)
 
-    for acc_id, (acc, base) in sorted(sums.items(), key=lambda kv: kv[1][0].code):
-        if base == 0:
-            continue
-        if base > 0:
-            debit = +base
-            credit = Decimal("0")
-            total_debits += debit
-        else:
-            debit = Decimal("0")
-            credit = +(-base)
-            total_credits += credit
-
-        rows.append(
-            {
-                "code": acc.code,
-                "name": acc.name,
-                "debit": str(debit),
-                "credit": str(credit),
-            }
-        )
 
+def _trial_balance_period(*, start: date, end: date) -> dict:
+    rows, totals = _trial_balance(_aggregate(start=start, end=end))
     return {
         "period": {"start": str(start), "end": str(end)},
         "rows": rows,
-        "totals": {
-            "debit": str(total_debits),
-            "credit": str(total_credits),
-            "balanced": (total_debits == total_credits),
-        },
+        "totals": totals,
     }
+
+
+# Lazy report builders behind the public functions, for `iter_report_json`
+_BUILDERS = {
+    income_statement: _income_statement,
+    balance_sheet: _balance_sheet,
+    trial_balance_as_of: _trial_balance_as_of,
+    trial_balance_period: _trial_balance_period,
+}
+
+
+def iter_report_json(report, **kwargs) -> Iterator[str]:
+    """
+    Encode one of the reports above (e.g. `iter_report_json(balance_sheet,
+    as_of=...)`) as JSON chunks for a streaming response; the row lists are
+    generated while the chunks are consumed, never held as a whole.
+    """
+    return _iter_json(_BUILDERS[report](**kwargs))
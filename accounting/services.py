@@ -1,17 +1,132 @@
+from datetime import date, timedelta
 from decimal import Decimal
 from django.db import transaction as dbtx
+from django.db.models import Sum
 from django.core.exceptions import ValidationError
-from .models import Transaction, EntryLine
+from . import caches
+from .models import Balance, ClosedPeriod, Transaction, EntryLine
 
 
-def create_and_post_transaction(*, journal, tx_date, memo, lines):
+def create_and_post_transaction(*, journal, tx_date, memo, lines=None, line_objs=None):
     """
     lines = [{"account": acc_obj, "debit": Decimal("10.00"), "credit": Decimal("0.00"), "description": "..."}, ...]
+    line_objs = unsaved EntryLine instances without a transaction, for callers
+    that build them directly; pass either this or `lines`.
+
+    Returns the saved, posted Transaction as built in memory (not re-read):
+    its fields and its `journal` are already loaded, so reading them costs
+    no query.
     """
+    if (lines is None) == (line_objs is None):
+        raise TypeError("Pass exactly one of 'lines' or 'line_objs'.")
+    tx = Transaction(journal=journal, tx_date=tx_date, memo=memo)
+    if line_objs is None:
+        objs = [EntryLine(transaction=tx, **l) for l in lines]
+    else:
+        objs = list(line_objs)
+        for o in objs:
+            o.transaction = tx
+    # Σ(debit)==Σ(credit) and ≥2 lines, checked on the in-memory lines
+    tx._validate_lines(objs)
+
     with dbtx.atomic():
-        tx = Transaction.objects.create(journal=journal, tx_date=tx_date, memo=memo)
-        for l in lines:
-            EntryLine.objects.create(transaction=tx, **l)
-        tx.full_clean()  # enforces Σ(debit)==Σ(credit) and ≥2 lines
-        tx.post()
+        tx.save()
+        EntryLine.objects.bulk_create(objs, batch_size=500)
+        tx.post(validate=False)
         return tx
+
+
+def create_and_post_transactions(specs):
+    """
+    Bulk form of `create_and_post_transaction`. specs = [{"journal": ...,
+    "tx_date": ..., "memo": ..., "line_objs": [unsaved EntryLine, ...]}, ...]
+
+    Every transaction is validated in memory first; then all of them are
+    written in one atomic block as one INSERT batch of (already posted)
+    transactions and one of their lines. bulk_create sends no post_save
+    signals, so the ledger version (cached reports) is bumped and closed
+    periods the new transactions fall into are reopened here.
+    """
+    txs, objs = [], []
+    for spec in specs:
+        tx = Transaction(
+            journal=spec["journal"],
+            tx_date=spec["tx_date"],
+            memo=spec["memo"],
+            posted=True,
+        )
+        lines = list(spec["line_objs"])
+        tx._validate_lines(lines)
+        for o in lines:
+            o.transaction = tx
+        txs.append(tx)
+        objs.extend(lines)
+
+    with dbtx.atomic():
+        Transaction.objects.bulk_create(txs, batch_size=500)
+        EntryLine.objects.bulk_create(objs, batch_size=500)
+        if txs:
+            ClosedPeriod.reopen_from(min(tx.tx_date for tx in txs))
+            caches.bump_ledger_version()
+    return txs
+
+
+def next_month(d: date) -> date:
+    """First day of the month following `d`."""
+    return (d.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def close_period(period: date) -> int:
+    """
+    Materialize per-account debit/credit totals of posted lines for the month
+    containing `period` into `Balance` (one row per account, period = first
+    day of the month) and mark the month closed. Re-running for the same
+    month overwrites its rows.
+
+    Months must be closed in order: the previous month has to be closed
+    unless nothing was posted before `period`'s month, otherwise
+    ValidationError. Postings dated in a closed month reopen it (see
+    `ClosedPeriod.reopen_from`).
+
+    Returns the number of Balance rows written.
+    """
+    start = period.replace(day=1)
+    prev = (start - timedelta(days=1)).replace(day=1)
+    if (
+        not ClosedPeriod.objects.filter(period=prev).exists()
+        and Transaction.objects.filter(posted=True, tx_date__lt=start).exists()
+    ):
+        raise ValidationError(
+            f"Cannot close {start:%Y-%m}: the previous month {prev:%Y-%m} is open."
+        )
+    rows = (
+        EntryLine.objects.filter(
+            transaction__posted=True,
+            transaction__tx_date__gte=start,
+            transaction__tx_date__lt=next_month(start),
+        )
+        .values("account_id")
+        .annotate(debit_total=Sum("debit"), credit_total=Sum("credit"))
+        .order_by()
+    )
+    objs = [
+        Balance(
+            account_id=r["account_id"],
+            period=start,
+            debit_total=r["debit_total"],
+            credit_total=r["credit_total"],
+        )
+        for r in rows
+    ]
+    with dbtx.atomic():
+        Balance.objects.filter(period=start).exclude(
+            account_id__in=[b.account_id for b in objs]
+        ).delete()
+        Balance.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["account", "period"],
+            update_fields=["debit_total", "credit_total"],
+        )
+        ClosedPeriod.objects.update_or_create(period=start)
+    return len(objs)
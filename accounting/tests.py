@@ -1,10 +1,25 @@
+import io
+import json
+from datetime import date
 from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from django.utils import timezone
 
-from .models import Account, AccountType, Journal, Transaction, EntryLine
-from .services import create_and_post_transaction
+from . import caches
+from .models import (
+    Account,
+    AccountType,
+    Balance,
+    ClosedPeriod,
+    EntryLine,
+    Journal,
+    Transaction,
+)
+from .reporting import balance_sheet, trial_balance_as_of
+from .services import close_period, create_and_post_transaction
 
 
 class AccountingModelTests(TestCase):
@@ -108,6 +123,35 @@ class AccountingModelTests(TestCase):
                 ],
             )
 
+    def test_service_accepts_prebuilt_line_objects(self):
+        tx = create_and_post_transaction(
+            journal=self.journal,
+            tx_date=timezone.now().date(),
+            memo="Prebuilt",
+            line_objs=[
+                EntryLine(account=self.cash, debit=Decimal("7.00")),
+                EntryLine(account=self.rev, credit=Decimal("7.00")),
+            ],
+        )
+        self.assertTrue(tx.posted)
+        self.assertEqual(tx.lines.count(), 2)
+
+    def test_service_returns_loaded_transaction(self):
+        tx = create_and_post_transaction(
+            journal=self.journal,
+            tx_date=timezone.now().date(),
+            memo="Loaded",
+            line_objs=[
+                EntryLine(account=self.cash, debit=Decimal("3.00")),
+                EntryLine(account=self.rev, credit=Decimal("3.00")),
+            ],
+        )
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(tx.id)
+            self.assertTrue(tx.posted)
+            self.assertEqual(tx.memo, "Loaded")
+            self.assertEqual(tx.journal.name, "GENERAL")
+
     def test_service_rejects_single_line(self):
         with self.assertRaises(ValidationError):
             create_and_post_transaction(
@@ -176,3 +220,146 @@ class AccountingModelTests(TestCase):
         credit_line.full_clean()
         self.assertEqual(debit_line.base_amount, Decimal("20.00"))
         self.assertEqual(credit_line.base_amount, Decimal("-20.00"))
+
+
+class ClosePeriodTests(TestCase):
+    def setUp(self):
+        self.cash = Account.objects.create(
+            code="1000", name="Cash", type=AccountType.ASSET, normal_debit=True
+        )
+        self.rev = Account.objects.create(
+            code="4000", name="Revenue", type=AccountType.INCOME, normal_debit=False
+        )
+        self.journal = Journal.objects.create(name="GENERAL")
+        for tx_date, amount in [
+            (date(2025, 7, 5), Decimal("40.00")),
+            (date(2025, 7, 20), Decimal("60.00")),
+            (date(2025, 8, 3), Decimal("25.00")),
+        ]:
+            create_and_post_transaction(
+                journal=self.journal,
+                tx_date=tx_date,
+                memo="Sale",
+                lines=[
+                    {"account": self.cash, "debit": amount, "credit": Decimal("0.00")},
+                    {"account": self.rev, "debit": Decimal("0.00"), "credit": amount},
+                ],
+            )
+
+    def test_close_period_writes_monthly_totals(self):
+        self.assertEqual(close_period(date(2025, 7, 15)), 2)
+        cash = Balance.objects.get(account=self.cash, period=date(2025, 7, 1))
+        self.assertEqual(cash.debit_total, Decimal("100.00"))
+        self.assertEqual(cash.credit_total, Decimal("0.00"))
+        # idempotent
+        close_period(date(2025, 7, 1))
+        self.assertEqual(Balance.objects.filter(period=date(2025, 7, 1)).count(), 2)
+
+    def test_reports_unchanged_by_closing(self):
+        as_of = date(2025, 8, 31)
+        before_bs = balance_sheet(as_of=as_of)
+        before_tb = trial_balance_as_of(as_of=as_of)
+        close_period(date(2025, 7, 1))
+        self.assertEqual(balance_sheet(as_of=as_of), before_bs)
+        self.assertEqual(trial_balance_as_of(as_of=as_of), before_tb)
+        self.assertEqual(before_bs["assets"][0]["amount"], "125.00")
+
+    def _sale(self, tx_date, amount):
+        create_and_post_transaction(
+            journal=self.journal,
+            tx_date=tx_date,
+            memo="Sale",
+            lines=[
+                {"account": self.cash, "debit": amount, "credit": Decimal("0.00")},
+                {"account": self.rev, "debit": Decimal("0.00"), "credit": amount},
+            ],
+        )
+
+    def test_close_period_refuses_gap(self):
+        with self.assertRaises(ValidationError):
+            close_period(date(2025, 8, 1))
+        self.assertFalse(ClosedPeriod.objects.exists())
+        self.assertFalse(Balance.objects.exists())
+        close_period(date(2025, 7, 1))
+        close_period(date(2025, 8, 1))
+        self.assertEqual(
+            list(ClosedPeriod.objects.values_list("period", flat=True)),
+            [date(2025, 7, 1), date(2025, 8, 1)],
+        )
+
+    def test_reports_ignore_closed_months_after_gap(self):
+        as_of = date(2025, 9, 30)
+        before = balance_sheet(as_of=as_of)
+        close_period(date(2025, 7, 1))
+        close_period(date(2025, 8, 1))
+        # e.g. rows written before months had to be closed in order
+        ClosedPeriod.objects.filter(period=date(2025, 7, 1)).delete()
+        Balance.objects.filter(period=date(2025, 7, 1)).delete()
+        self.assertEqual(balance_sheet(as_of=as_of), before)
+        self.assertEqual(before["assets"][0]["amount"], "125.00")
+
+    def test_backdated_posting_reopens_closed_months(self):
+        close_period(date(2025, 7, 1))
+        close_period(date(2025, 8, 1))
+        self._sale(date(2025, 7, 25), Decimal("10.00"))
+        self.assertFalse(ClosedPeriod.objects.exists())
+        self.assertFalse(Balance.objects.exists())
+        as_of = date(2025, 9, 30)
+        self.assertEqual(balance_sheet(as_of=as_of)["assets"][0]["amount"], "135.00")
+        self.assertEqual(trial_balance_as_of(as_of=as_of)["totals"]["debit"], "135.00")
+
+    def test_editing_posted_lines_reopens_closed_months(self):
+        close_period(date(2025, 7, 1))
+        tx = Transaction.objects.get(tx_date=date(2025, 7, 5))
+        for line in tx.lines.all():
+            if line.debit:
+                line.debit = Decimal("90.00")
+            else:
+                line.credit = Decimal("90.00")
+            line.save()
+        self.assertFalse(ClosedPeriod.objects.exists())
+        as_of = date(2025, 8, 31)
+        self.assertEqual(balance_sheet(as_of=as_of)["assets"][0]["amount"], "175.00")
+
+        close_period(date(2025, 7, 1))
+        tx.lines.all().delete()
+        self.assertFalse(Balance.objects.exists())
+        self.assertEqual(balance_sheet(as_of=as_of)["assets"][0]["amount"], "85.00")
+
+    def test_writer_streams_same_report(self):
+        as_of = date(2025, 8, 31)
+        buf = io.StringIO()
+        self.assertIsNone(balance_sheet(as_of=as_of, writer=buf))
+        self.assertEqual(json.loads(buf.getvalue()), balance_sheet(as_of=as_of))
+
+
+class LedgerVersionTests(TestCase):
+    def test_version_changes_on_ledger_writes(self):
+        v = caches.ledger_version()
+        self.assertEqual(caches.ledger_version(), v)
+        cash = Account.objects.create(
+            code="1000", name="Cash", type=AccountType.ASSET, normal_debit=True
+        )
+        self.assertNotEqual(caches.ledger_version(), v)
+        v = caches.ledger_version()
+        cash.name = "Petty Cash"
+        cash.save()
+        self.assertNotEqual(caches.ledger_version(), v)
+
+
+class TransactionAdminTests(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser("admin", password="pw")
+        self.client.force_login(admin_user)
+        journal = Journal.objects.create(name="GENERAL")
+        Transaction.objects.create(journal=journal, tx_date=date(2025, 8, 1))
+
+    def test_totals_param_kept_in_changelist_links(self):
+        url = reverse("admin:accounting_transaction_changelist")
+        resp = self.client.get(url + "?totals=1&posted__exact=0")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Σ Debit")
+        cl = resp.context["cl"]
+        self.assertEqual(cl.result_count, 1)
+        self.assertIn("totals=1", cl.get_query_string({"o": "2"}))
+        self.assertIn("totals=1", cl.get_query_string({"p": 1}))
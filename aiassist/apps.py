@@ -1,6 +1,22 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AiassistConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "aiassist"
+
+    def ready(self):
+        # Load the model at worker start instead of on the first prediction.
+        # Opt-in so management commands and tests don't pay for sklearn.
+        if not getattr(settings, "AI_PRELOAD_MODEL", False):
+            return
+        # runserver's autoreloader parent never serves requests
+        if "runserver" in sys.argv and os.environ.get("RUN_MAIN") != "true":
+            return
+        from . import services
+
+        services._get_provider()
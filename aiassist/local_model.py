@@ -1,64 +1,246 @@
-import joblib, os, re
+import joblib, logging, os, re
+from joblib import Parallel, delayed, effective_n_jobs
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Iterable, List, Sequence, Tuple
 from sklearn.feature_extraction.text import HashingVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import FeatureUnion
+from sklearn.linear_model import SGDClassifier
 from sklearn.preprocessing import KBinsDiscretizer
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
+from sklearn.utils import gen_even_slices
+from scipy.special import expit
 import numpy as np
+import scipy.sparse as sp
 from .providers import Categorizer
 
 MODEL_PATH = Path(os.environ.get("AI_MODEL_PATH", ".model/category.joblib"))
 
+# Hashed text dimensions. The vectorizer keeps no vocabulary, so the model
+# file is dominated by clf.coef_ (n_classes x TEXT_FEATURES); raising this
+# grows the file and load time linearly.
+TEXT_FEATURES = 2**15
+
+# Below this many texts, worker startup costs more than hashing serially
+PARALLEL_MIN_ROWS = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+def quantize_coef(coef):
+    """Per-class symmetric int8 quantization: coef ~= coef_int8 * scale."""
+    scale = np.abs(coef).max(axis=1, keepdims=True) / 127
+    scale[scale == 0] = 1.0
+    return np.round(coef / scale).astype(np.int8), scale
+
+
+class CategorizerModel:
+    """
+    Hashed text features + one-hot amount bins feeding a linear classifier.
+
+    The two feature blocks are stacked by hand into one CSR matrix (no
+    ColumnTransformer) and the model is persisted as a plain
+    (vec, binner, clf, coef_q) tuple. `predict_proba`/`classes_`/`steps`
+    mirror the sklearn Pipeline API the rest of the app expects; X rows are
+    [text, amount].
+
+    coef_q is an int8 copy of clf.coef_ plus per-class scales, written on
+    dump. When present, `predict`, `predict_proba` and `decision_function`
+    all score with it and only dequantize the weight columns the input
+    actually touches, so a memory-mapped load never pages in the float64
+    coef_. Files without it use the float path.
+    """
+
+    def __init__(self, vec, binner, clf, coef_q=None):
+        self.vec = vec
+        self.binner = binner
+        self.clf = clf
+        self.coef_q = coef_q
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH, **kwargs) -> "CategorizerModel":
+        obj = joblib.load(path, **kwargs)
+        # Files written before the tuple format hold a pickled sklearn Pipeline
+        if not isinstance(obj, tuple):
+            raise ValueError(f"{path} holds a {type(obj).__name__}, not a model")
+        return cls(*obj)
+
+    def dump(self, path: Path = MODEL_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.coef_q = quantize_coef(self.clf.coef_)
+        # Write aside and rename: processes that memory-mapped the old file
+        # keep their inode instead of seeing it truncated under them
+        tmp = path.with_name(path.name + ".tmp")
+        joblib.dump((self.vec, self.binner, self.clf, self.coef_q), tmp)
+        os.replace(tmp, path)
+
+    @property
+    def classes_(self):
+        return self.clf.classes_
+
+    @property
+    def steps(self):
+        return [("vec", self.vec), ("amt", self.binner), ("clf", self.clf)]
+
+    @property
+    def named_steps(self):
+        return dict(self.steps)
+
+    def transform(self, texts, amounts, *, n_jobs=None):
+        amounts = np.asarray(amounts, dtype=float).reshape(-1, 1)
+        return sp.hstack(
+            [self._hash_texts(texts, n_jobs), self.binner.transform(amounts)]
+        ).tocsr()
+
+    def _hash_texts(self, texts, n_jobs):
+        # HashingVectorizer is stateless, so row chunks hash independently
+        n_jobs = effective_n_jobs(n_jobs)
+        if n_jobs == 1 or len(texts) < PARALLEL_MIN_ROWS:
+            return self.vec.transform(texts)
+        chunks = Parallel(n_jobs=n_jobs)(
+            delayed(self.vec.transform)(texts[s])
+            for s in gen_even_slices(len(texts), n_jobs)
+        )
+        return sp.vstack(chunks)
+
+    def _features(self, X):
+        return self.transform([r[0] for r in X], [r[1] for r in X])
+
+    def predict(self, X):
+        # argmax of the same scores predict_proba uses, as the linear classifier
+        # does, so the label always matches the most probable class
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        F = self._features(X)
+        if self.coef_q is None:
+            return self.clf.predict_proba(F)
+        # same one-vs-rest normalization as SGDClassifier(loss="log_loss")
+        prob = expit(self._quantized_decision(F))
+        if prob.ndim == 1:
+            return np.vstack([1 - prob, prob]).T
+        return prob / prob.sum(axis=1, keepdims=True)
+
+    def _quantized_decision(self, F):
+        coef, scale = self.coef_q
+        cols = np.unique(F.indices)
+        W = coef[:, cols] * scale  # float64, n_classes x touched columns
+        scores = F[:, cols] @ W.T + self.clf.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def decision_function(self, X):
+        F = self._features(X)
+        if self.coef_q is None:
+            return self.clf.decision_function(F)
+        return self._quantized_decision(F)
+
+
+def _load_saved_model(**kwargs) -> CategorizerModel | None:
+    """The model at MODEL_PATH, or None if there is none or it is unreadable."""
+    if not MODEL_PATH.exists():
+        return None
+    try:
+        return CategorizerModel.load(MODEL_PATH, **kwargs)
+    except (AttributeError, ImportError, TypeError, ValueError) as e:
+        # Old or foreign file: callers fall back instead of failing
+        logger.warning(
+            "Cannot load %s (%s); retrain required, run train_categorizer",
+            MODEL_PATH,
+            e,
+        )
+        return None
+
 
 class LocalCategorizer(Categorizer):
     def __init__(self):
-        if MODEL_PATH.exists():
-            self.model = joblib.load(MODEL_PATH)
-        else:
-            self.model = None
+        # Inference uses the int8 weights; the float coef_ stays unpaged
+        self.model = _load_saved_model(mmap_mode="r")
 
     def predict(
         self, *, payee: str, narrative: str, amount: float
     ) -> Tuple[str, float]:
+        return self.predict_batch([(payee, narrative, amount)])[0]
+
+    def predict_batch(
+        self, items: Sequence[Tuple[str, str, float]]
+    ) -> List[Tuple[str, float]]:
         if not self.model:
-            return ("5000", 0.10)  # fallback default to Office Supplies
-        X = [[f"{payee} {narrative or ''}", float(amount)]]
-        probs = self.model.predict_proba(X)[0]
-        idx = probs.argmax()
-        return (self.model.classes_[idx], float(probs[idx]))
+            # fallback default to Office Supplies
+            return [("5000", 0.10)] * len(items)
+        if not items:
+            return []
+        # One predict_proba over all rows instead of one call per row
+        X = [[f"{p} {n or ''}", float(a)] for p, n, a in items]
+        P = self.model.predict_proba(X)
+        idx = P.argmax(axis=1)
+        conf = P[np.arange(len(idx)), idx]
+        return [
+            (str(code), float(c)) for code, c in zip(self.model.classes_[idx], conf)
+        ]
+
 
+LEDGER_FIELDS = ("account__code", "description", "debit", "credit")
 
-def train_from_ledger(lines_qs):
+
+def ledger_rows(lines_qs):
+    """EntryLine queryset -> (account code, text, debit, credit) tuples."""
+    return lines_qs.values_list(*LEDGER_FIELDS)
+
+
+def train_from_ledger(
+    rows,
+    *,
+    incremental: bool = False,
+    n_jobs: int | None = None,
+    refit_rows: Callable[[], Iterable] | None = None,
+) -> Tuple[int, bool]:
     """
-    lines_qs: queryset of EntryLine joined with Transaction and Account
+    rows: iterable of (account_code, description, debit, credit) tuples, see
+    `ledger_rows`; stream large ledgers with `.iterator(...)`
     using: payee/narrative from a linked BankTransaction or line.description
+
+    incremental: when a model already exists and knows every account code in
+    `rows`, update it with partial_fit on just these rows instead of
+    refitting from scratch. Otherwise a fit on `rows` alone would forget the
+    rest of the ledger, so the model is refit on `refit_rows()` (every
+    ledger row) instead, or, without `refit_rows`, nothing is written. A
+    model file that cannot be loaded counts as no model.
+
+    n_jobs: workers for hashing the texts (joblib semantics, -1 = all cores);
+    only used for large batches.
+
+    Returns (rows seen, whether a model was written).
     """
-    rows = []
-    for l in lines_qs.select_related("account", "transaction"):
-        text = getattr(l, "description", "") or ""
-        amt = float(abs(l.debit or l.credit))
-        rows.append((f"{text}", amt, l.account.code))
-    if not rows:
-        return
-    texts = [r[0] for r in rows]
-    amounts = [[r[1]] for r in rows]
-    y = [r[2] for r in rows]
-
-    text_vec = HashingVectorizer(n_features=2**15, lowercase=True, ngram_range=(1, 2))
-    amt_bins = KBinsDiscretizer(n_bins=8, encode="onehot-dense", strategy="quantile")
-    ct = ColumnTransformer(
-        [
-            ("text", text_vec, 0),
-            ("amt", amt_bins, [1]),
-        ]
+    texts, amounts, y = [], [], []
+    for code, text, debit, credit in rows:
+        texts.append(text or "")
+        amounts.append(float(abs(debit or credit)))
+        y.append(code)
+    if not y:
+        return 0, False
+
+    if incremental:
+        model = _load_saved_model()
+        if model is not None:
+            clf = model.clf
+            if hasattr(clf, "partial_fit") and set(y) <= set(clf.classes_):
+                X = model.transform(texts, amounts, n_jobs=n_jobs)
+                clf.partial_fit(X, y, classes=clf.classes_)
+                model.dump(MODEL_PATH)
+                return len(y), True
+        if refit_rows is None:
+            return len(y), False
+        return train_from_ledger(refit_rows(), n_jobs=n_jobs)
+
+    text_vec = HashingVectorizer(
+        n_features=TEXT_FEATURES, lowercase=True, ngram_range=(1, 2)
     )
-    clf = LogisticRegression(max_iter=200)
-    pipe = Pipeline(steps=[("ct", ct), ("clf", clf)])
-    X = list(zip(texts, amounts))
-    X_arr = [[t, a[0]] for t, a in X]
-    pipe.fit(X_arr, y)
-    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(pipe, MODEL_PATH)
+    # Sparse one-hot keeps the whole feature matrix CSR
+    amt_bins = KBinsDiscretizer(n_bins=8, encode="onehot", strategy="quantile")
+    amt_bins.fit(np.asarray(amounts).reshape(-1, 1))
+    # log_loss keeps predict_proba; partial_fit allows incremental updates
+    clf = SGDClassifier(loss="log_loss", alpha=1e-4, max_iter=5, warm_start=True)
+    model = CategorizerModel(text_vec, amt_bins, clf)
+    clf.fit(model.transform(texts, amounts, n_jobs=n_jobs), y)
+    model.dump(MODEL_PATH)
+    return len(y), True
@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
 from pathlib import Path
-import joblib
 import json
 
 DEFAULT_MODEL_PATH = Path(".model/category.joblib")
@@ -22,6 +21,9 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **opts):
+        # numpy/scipy/sklearn load here, not on every manage.py invocation
+        from aiassist.local_model import CategorizerModel
+
         path = Path(opts["model"])
         sample_raw = opts["sample"]
 
@@ -32,7 +34,11 @@ class Command(BaseCommand):
             return
 
         try:
-            model = joblib.load(path)
+            # Large numpy arrays (coef_) become read-only memory maps instead of
+            # heap copies; fine here since the health check never refits.
+            # Requires the arrays to be pickled as plain ndarrays (true for
+            # sklearn linear models dumped with joblib, uncompressed).
+            model = CategorizerModel.load(path, mmap_mode="r")
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Failed to load model: {e!r}"))
             self.stdout.write("Delete the corrupt file and retrain:")
@@ -71,12 +77,27 @@ class Command(BaseCommand):
         except Exception:
             text_part, amt = sample_raw, 0.0
 
+        # Pick the scoring method up front rather than failing inside sklearn
+        # after the features were already built
+        has_proba = classes is not None and hasattr(clf, "predict_proba")
+        has_decision = classes is not None and hasattr(clf, "decision_function")
         try:
-            pred = model.predict([[text_part, amt]])
-            proba = model.predict_proba([[text_part, amt]])
+            X = [[text_part, amt]]
+            if has_proba:
+                # One featurization pass; the label is the argmax column
+                scores = model.predict_proba(X)
+                pred = classes[scores.argmax(axis=1)]
+            elif has_decision:
+                scores = model.decision_function(X)
+                if scores.ndim == 1:  # binary: sign picks classes_[1] vs [0]
+                    pred = classes[(scores > 0).astype(int)]
+                else:
+                    pred = classes[scores.argmax(axis=1)]
+            else:
+                pred, scores = model.predict(X), "N/A"
             self.stdout.write("\n--- Example prediction ---")
             self.stdout.write(str(pred))
-            self.stdout.write(str(proba))
+            self.stdout.write(str(scores))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f"Prediction failed on sample: {e!r}"))
 
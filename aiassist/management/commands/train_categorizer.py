@@ -1,6 +1,5 @@
+from datetime import date
 from django.core.management.base import BaseCommand
-from accounting.models import EntryLine
-from aiassist.local_model import train_from_ledger
 
 
 class Command(BaseCommand):
@@ -8,19 +7,47 @@ class Command(BaseCommand):
         "Train or update the local account categorizer model from posted ledger entries"
     )
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Only learn from lines dated on/after YYYY-MM-DD, updating the "
+            "existing model incrementally when possible",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Parallel workers for text featurization (-1 = all cores)",
+        )
+
     def handle(self, *args, **options):
+        # numpy/scipy/sklearn load here, not on every manage.py invocation
+        from accounting.models import EntryLine
+        from aiassist.local_model import ledger_rows, train_from_ledger
+        from aiassist.services import reload_provider
+
         # Grab only posted entry lines
-        qs = EntryLine.objects.filter(transaction__posted=True).select_related(
-            "account", "transaction"
-        )
+        posted = EntryLine.objects.filter(transaction__posted=True)
+        since = options["since"]
+        qs = posted.filter(transaction__tx_date__gte=since) if since else posted
 
-        if not qs.exists():
+        # One streamed SELECT; rows are counted as they are consumed
+        rows = ledger_rows(qs).iterator(chunk_size=5000)
+        n_rows, trained = train_from_ledger(
+            rows,
+            incremental=since is not None,
+            n_jobs=options["jobs"],
+            # new account codes (or no model yet): refit on the whole ledger
+            refit_rows=lambda: ledger_rows(posted).iterator(chunk_size=5000),
+        )
+        if not trained:
             self.stdout.write(
                 self.style.WARNING("No posted transactions found. Nothing to train on.")
             )
             return
 
-        train_from_ledger(qs)
+        reload_provider()
         self.stdout.write(
-            self.style.SUCCESS(f"Training complete on {qs.count()} entry lines.")
+            self.style.SUCCESS(f"Training complete on {n_rows} entry lines.")
         )
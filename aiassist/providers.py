@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import List, Sequence, Tuple
 
 
 class Categorizer(ABC):
@@ -8,3 +8,9 @@ class Categorizer(ABC):
         self, *, payee: str, narrative: str, amount: float
     ) -> Tuple[str, float]:
         """Return (account_code, confidence)"""
+
+    def predict_batch(
+        self, items: Sequence[Tuple[str, str, float]]
+    ) -> List[Tuple[str, float]]:
+        """Predict many (payee, narrative, amount) rows; override to vectorize."""
+        return [self.predict(payee=p, narrative=n, amount=a) for p, n, a in items]
@@ -1,24 +1,61 @@
-from .local_model import LocalCategorizer, MODEL_PATH
+from functools import lru_cache
 
-# Lazily create (and if needed reload) the provider so tests or runtime
-# can remove/create the model file without leaving a stale instance.
-_provider = None
+from .local_model import MODEL_PATH, LocalCategorizer
+
+
+def _model_mtime():
+    try:
+        return MODEL_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_provider():
+    # Created (and the model file loaded) once per process; the mtime is
+    # read first so a file written while loading is not mistaken for this one
+    mtime = _model_mtime()
+    return LocalCategorizer(), mtime
 
 
 def _get_provider():
-    global _provider
-    if _provider is None:
-        _provider = LocalCategorizer()
-        return _provider
-    # if a model file appears on disk after the provider was created with no model,
-    # recreate it so predictions use the newly written model.
-    if getattr(_provider, "model", None) is None and MODEL_PATH.exists():
-        _provider = LocalCategorizer()
-    return _provider
+    provider, mtime = _load_provider()
+    # Only a provider without a model stats the disk, to pick up a model
+    # trained (possibly by another process) since it was created
+    if provider.model is None and _model_mtime() != mtime:
+        _load_provider.cache_clear()
+        provider, _ = _load_provider()
+    return provider
+
+
+def reload_provider():
+    """Drop the cached provider so the next prediction reloads the model file.
+
+    Call after (re)training or removing the model in the same process.
+    """
+    _load_provider.cache_clear()
+
+
+def _as_float(amount) -> float:
+    # Skip the conversion when callers already pass a float
+    return amount if type(amount) is float else float(amount)
 
 
 def predict_account_code(*, payee: str, narrative: str = "", amount=None):
     provider = _get_provider()
     return provider.predict(
-        payee=payee, narrative=narrative or "", amount=float(amount)
+        payee=payee, narrative=narrative or "", amount=_as_float(amount)
     )
+
+
+def predict_account_codes(items):
+    """
+    Batch form of `predict_account_code`: items are dicts with `payee` and
+    optional `narrative`/`amount`. The provider featurizes and scores all rows
+    in one predict_proba call. Returns [(account_code, confidence), ...].
+    """
+    rows = [
+        (i["payee"], i.get("narrative") or "", _as_float(i.get("amount") or 0.0))
+        for i in items
+    ]
+    return _get_provider().predict_batch(rows)
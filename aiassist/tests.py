@@ -1,3 +1,4 @@
+import joblib
 import os
 from decimal import Decimal
 from pathlib import Path
@@ -6,62 +7,148 @@ from django.core.management import call_command
 from django.utils import timezone
 
 from accounting.models import Account, AccountType, Journal, Transaction, EntryLine
-from .local_model import MODEL_PATH, train_from_ledger, LocalCategorizer
-from .services import predict_account_code
+from .local_model import (
+    MODEL_PATH,
+    CategorizerModel,
+    LocalCategorizer,
+    ledger_rows,
+    train_from_ledger,
+)
+from .services import predict_account_code, predict_account_codes, reload_provider
 
 
-class AIAssistTests(TestCase):
-    def setUp(self):
-        # Minimal chart for tests
-        self.acc_supplies = Account.objects.create(
-            code="5000",
-            name="Office Supplies",
-            type=AccountType.EXPENSE,
-            normal_debit=True,
-        )
-        self.acc_travel = Account.objects.create(
-            code="5200", name="Travel", type=AccountType.EXPENSE, normal_debit=True
-        )
-        self.acc_misc = Account.objects.create(
-            code="5999", name="Misc", type=AccountType.EXPENSE, normal_debit=True
-        )
-        self.journal = Journal.objects.create(name="GENERAL")
+def _remove_model():
+    # Clean up model file if created
+    if MODEL_PATH.exists():
+        try:
+            MODEL_PATH.unlink()
+        except OSError:
+            pass
+    reload_provider()
 
-    def _make_line(self, account, description: str, amount: Decimal):
-        tx = Transaction.objects.create(journal=self.journal, tx_date=timezone.now())
-        EntryLine.objects.create(transaction=tx, account=account, debit=amount)
-        EntryLine.objects.create(transaction=tx, account=self.acc_misc, credit=amount)
-        return tx
 
-    def tearDown(self):
-        # Clean up model file if created
-        if MODEL_PATH.exists():
-            try:
-                MODEL_PATH.unlink()
-            except OSError:
-                pass
+class AIAssistFallbackTests(TestCase):
+    def setUp(self):
+        # Ensure model file absent
+        _remove_model()
 
     def test_fallback_returns_default_when_no_model(self):
-        # Ensure model file absent
-        if MODEL_PATH.exists():
-            MODEL_PATH.unlink()
         code, conf = predict_account_code(
             payee="AMAZON EU", narrative="cables", amount=Decimal("12.99")
         )
         self.assertEqual(code, "5000")  # defined fallback
         self.assertGreaterEqual(conf, 0)
 
-    def test_training_creates_model_file_and_predicts(self):
+    def test_model_trained_later_is_picked_up(self):
+        predict_account_code(payee="AMAZON EU", narrative="cables", amount=1.0)
+        rows = [
+            ("5200", "printer paper", Decimal("30.00"), None),
+            ("5300", "hotel booking", Decimal("450.00"), None),
+        ]
+        self.addCleanup(_remove_model)
+        train_from_ledger(rows)  # no reload_provider() call
+        code, _ = predict_account_code(payee="hotel", narrative="booking", amount=450.0)
+        self.assertIn(code, ["5200", "5300"])
+
+    def test_old_pipeline_file_falls_back(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import Pipeline
+
+        MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        old = Pipeline([("vec", HashingVectorizer()), ("clf", SGDClassifier())])
+        joblib.dump(old, MODEL_PATH)
+        self.addCleanup(_remove_model)
+        with self.assertLogs("aiassist.local_model", "WARNING") as logs:
+            cat = LocalCategorizer()
+        self.assertIsNone(cat.model)
+        self.assertIn("retrain required", logs.output[0])
+        self.assertEqual(
+            cat.predict(payee="AMAZON EU", narrative="cables", amount=12.99),
+            ("5000", 0.10),
+        )
+
+    def test_incremental_over_old_pipeline_file_refits(self):
+        from sklearn.pipeline import Pipeline
+
+        MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(Pipeline([("clf", None)]), MODEL_PATH)
+        self.addCleanup(_remove_model)
+        rows = [
+            ("5000", "printer paper", Decimal("30.00"), None),
+            ("5200", "hotel booking", Decimal("450.00"), None),
+        ]
+        with self.assertLogs("aiassist.local_model", "WARNING"):
+            result = train_from_ledger(rows, incremental=True, refit_rows=lambda: rows)
+        self.assertEqual(result, (2, True))
+        model = CategorizerModel.load(MODEL_PATH)
+        self.assertEqual(sorted(model.classes_), ["5000", "5200"])
+
+
+class AIAssistTests(TestCase):
+    """The model is trained once for the class; tests only predict with it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Minimal chart for tests
+        Account.objects.bulk_create(
+            [
+                Account(
+                    code="5000",
+                    name="Office Supplies",
+                    type=AccountType.EXPENSE,
+                    normal_debit=True,
+                ),
+                Account(
+                    code="5200",
+                    name="Travel",
+                    type=AccountType.EXPENSE,
+                    normal_debit=True,
+                ),
+                Account(
+                    code="5999",
+                    name="Misc",
+                    type=AccountType.EXPENSE,
+                    normal_debit=True,
+                ),
+            ]
+        )
+        accounts = Account.objects.in_bulk(field_name="code")
+        cls.acc_supplies = accounts["5000"]
+        cls.acc_travel = accounts["5200"]
+        cls.acc_misc = accounts["5999"]
+        cls.journal = Journal.objects.create(name="GENERAL")
+
         # Generate some training data
-        self._make_line(self.acc_supplies, "printer paper", Decimal("30.00"))
-        self._make_line(self.acc_supplies, "pens and notebooks", Decimal("15.00"))
-        self._make_line(self.acc_travel, "flight ticket", Decimal("300.00"))
-        self._make_line(self.acc_travel, "hotel booking", Decimal("450.00"))
+        cls._make_line(cls.acc_supplies, "printer paper", Decimal("30.00"))
+        cls._make_line(cls.acc_supplies, "pens and notebooks", Decimal("15.00"))
+        cls._make_line(cls.acc_travel, "flight ticket", Decimal("300.00"))
+        cls._make_line(cls.acc_travel, "hotel booking", Decimal("450.00"))
 
         qs = EntryLine.objects.filter(
             account__code__in=["5000", "5200"]
         )  # only the debit lines interest
-        train_from_ledger(qs)
+        cls.n_rows, cls.trained = train_from_ledger(ledger_rows(qs))
+        reload_provider()
+
+    @classmethod
+    def tearDownClass(cls):
+        _remove_model()
+        super().tearDownClass()
+
+    @classmethod
+    def _make_line(cls, account, description: str, amount: Decimal):
+        tx = Transaction.objects.create(journal=cls.journal, tx_date=timezone.now())
+        EntryLine.objects.bulk_create(
+            [
+                EntryLine(transaction=tx, account=account, debit=amount),
+                EntryLine(transaction=tx, account=cls.acc_misc, credit=amount),
+            ]
+        )
+        return tx
+
+    def test_training_creates_model_file_and_predicts(self):
+        self.assertEqual((self.n_rows, self.trained), (4, True))
         self.assertTrue(MODEL_PATH.exists(), "Model file not created")
 
         # New predictor should load model
@@ -73,13 +160,62 @@ class AIAssistTests(TestCase):
         self.assertGreater(conf, 0.0)
 
     def test_predict_service_with_model(self):
-        # Need at least two classes for logistic regression
-        self._make_line(self.acc_supplies, "paper", Decimal("10.00"))
-        self._make_line(self.acc_travel, "flight", Decimal("120.00"))
-        qs = EntryLine.objects.filter(account__code__in=["5000", "5200"])
-        train_from_ledger(qs)
         code, conf = predict_account_code(
             payee="paper shop", narrative="office pads", amount=12.0
         )
         self.assertIn(code, ["5000", "5200"])
         self.assertGreater(conf, 0.0)
+
+    def test_predict_account_codes_matches_single(self):
+        items = [
+            {"payee": "paper shop", "narrative": "office pads", "amount": 12.0},
+            {"payee": "airline", "amount": "300.00"},
+        ]
+        batch = predict_account_codes(items)
+        self.assertEqual(len(batch), 2)
+        for item, (code, conf) in zip(items, batch):
+            single = predict_account_code(**item)
+            self.assertEqual(code, single[0])
+            self.assertAlmostEqual(conf, single[1])
+
+    def _restore_model_after_test(self):
+        # The class shares one trained file; tests that retrain put it back
+        saved = MODEL_PATH.read_bytes()
+
+        def restore():
+            MODEL_PATH.write_bytes(saved)
+            reload_provider()
+
+        self.addCleanup(restore)
+
+    def test_incremental_with_unseen_code_does_not_refit_on_subset(self):
+        self._restore_model_after_test()
+        new_rows = ledger_rows(EntryLine.objects.filter(account=self.acc_misc))
+        mtime = MODEL_PATH.stat().st_mtime_ns
+        self.assertEqual(train_from_ledger(new_rows, incremental=True), (4, False))
+        self.assertEqual(MODEL_PATH.stat().st_mtime_ns, mtime)
+
+        full = EntryLine.objects.filter(account__code__in=["5000", "5200"])
+        n_rows, trained = train_from_ledger(
+            new_rows, incremental=True, refit_rows=lambda: ledger_rows(full)
+        )
+        self.assertEqual((n_rows, trained), (4, True))
+        model = CategorizerModel.load(MODEL_PATH)
+        self.assertEqual(sorted(model.classes_), ["5000", "5200"])
+
+    def test_quantized_proba_close_to_float(self):
+        model = CategorizerModel.load(MODEL_PATH)
+        self.assertIsNotNone(model.coef_q)
+        X = [["printer paper", 30.0], ["hotel booking", 450.0], ["misc", 1.0]]
+        exact = model.clf.predict_proba(model._features(X))
+        quantized = model.predict_proba(X)
+        self.assertEqual(quantized.shape, exact.shape)
+        for q_row, e_row in zip(quantized.tolist(), exact.tolist()):
+            for q, e in zip(q_row, e_row):
+                self.assertAlmostEqual(q, e, delta=0.02)
+
+    def test_predict_agrees_with_predict_proba(self):
+        model = CategorizerModel.load(MODEL_PATH)
+        X = [["printer paper", 30.0], ["hotel booking", 450.0], ["misc", 1.0]]
+        P = model.predict_proba(X)
+        self.assertEqual(list(model.predict(X)), list(model.classes_[P.argmax(axis=1)]))
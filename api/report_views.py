@@ -7,25 +7,70 @@ the accounting.reporting helpers.
 """
 
 from datetime import date
-from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework import status
 
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
 
+from accounting.caches import ledger_version
 from accounting.reporting import (
     balance_sheet,
     income_statement,
+    iter_report_json,
     trial_balance_as_of,
     trial_balance_period,
 )
 
+from .renderers import ORJSONRenderer
+from .schema import extend_schema
+
 
 def _parse_date(s: str) -> date:
     return date.fromisoformat(s)
 
 
+def _cached_report(report, **kwargs):
+    """
+    Run a reporting helper through Django's cache, so dashboards polling the
+    same window skip the aggregation. The key carries the ledger version,
+    which every ledger write bumps; REPORT_CACHE_TIMEOUT bounds the rest.
+    """
+    args = ",".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    key = f"report:{ledger_version()}:{report.__name__}:{args}"
+    data = cache.get(key)
+    if data is None:
+        data = report(**kwargs)
+        cache.set(key, data, timeout=settings.REPORT_CACHE_TIMEOUT)
+    return data
+
+
+STREAM_PARAM = OpenApiParameter(
+    name="stream",
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description="Write the JSON straight to the response instead of building "
+    "the whole report in memory (large ledgers)",
+)
+
+
+def _report_response(request, report, **kwargs):
+    """
+    Respond with the cached report; on ?stream=1 bypass the cache and stream
+    the JSON as the rows are generated.
+    """
+    if request.query_params.get("stream") in ("1", "true"):
+        return StreamingHttpResponse(
+            iter_report_json(report, **kwargs), content_type="application/json"
+        )
+    return Response(_cached_report(report, **kwargs))
+
+
 @extend_schema(
     summary="Income Statement (Profit & Loss)",
     parameters=[
@@ -43,10 +88,12 @@ def _parse_date(s: str) -> date:
             required=True,
             description="End date inclusive (YYYY-MM-DD)",
         ),
+        STREAM_PARAM,
     ],
     responses={200: None},
 )
 @api_view(["GET"])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def income_statement_view(request):
     """Return an income statement (profit & loss) for the requested period.
@@ -62,8 +109,9 @@ def income_statement_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    data = income_statement(start=_parse_date(start), end=_parse_date(end))
-    return Response(data)
+    return _report_response(
+        request, income_statement, start=_parse_date(start), end=_parse_date(end)
+    )
 
 
 @extend_schema(
@@ -76,10 +124,12 @@ def income_statement_view(request):
             required=True,
             description="Point-in-time date (YYYY-MM-DD)",
         ),
+        STREAM_PARAM,
     ],
     responses={200: None},
 )
 @api_view(["GET"])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def balance_sheet_view(request):
     """Return a balance sheet as of the requested date.
@@ -94,8 +144,7 @@ def balance_sheet_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    data = balance_sheet(as_of=_parse_date(as_of))
-    return Response(data)
+    return _report_response(request, balance_sheet, as_of=_parse_date(as_of))
 
 
 @extend_schema(
@@ -123,10 +172,12 @@ def balance_sheet_view(request):
             required=False,
             description="End date inclusive (YYYY-MM-DD)",
         ),
+        STREAM_PARAM,
     ],
     responses={200: None},
 )
 @api_view(["GET"])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def trial_balance_view(request):
     """Return a trial balance for either a point in time or a period.
@@ -134,24 +185,31 @@ def trial_balance_view(request):
     Use either the `as_of` query parameter (single date) or the pair
     `from` and `to` to request a period. Providing both is an error.
     """
-    as_of = request.query_params.get("as_of")
-    start = request.query_params.get("from")
-    end = request.query_params.get("to")
+    params = request.query_params
+    as_of, start, end = params.get("as_of"), params.get("from"), params.get("to")
+
+    # Which of as_of/from/to are present, as a 3-bit mask
+    mask = (bool(as_of) << 2) | (bool(start) << 1) | bool(end)
+    handlers = {
+        0b100: lambda: _report_response(
+            request, trial_balance_as_of, as_of=_parse_date(as_of)
+        ),
+        0b011: lambda: _report_response(
+            request,
+            trial_balance_period,
+            start=_parse_date(start),
+            end=_parse_date(end),
+        ),
+    }
+    handler = handlers.get(mask)
+    if handler is not None:
+        return handler()
 
-    if as_of and (start or end):
+    if mask & 0b100:
         return Response(
             {"detail": "Provide either 'as_of' or 'from'+'to', not both."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-
-    if as_of:
-        data = trial_balance_as_of(as_of=_parse_date(as_of))
-        return Response(data)
-
-    if start and end:
-        data = trial_balance_period(start=_parse_date(start), end=_parse_date(end))
-        return Response(data)
-
     return Response(
         {"detail": "Required: 'as_of' OR 'from' and 'to' (YYYY-MM-DD)."},
         status=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,34 @@
+"""
+Settings-gated drf-spectacular decorators.
+
+`extend_schema`/`extend_schema_view` do real work at import time
+(extend_schema_view subclasses the view per action). With
+`settings.API_SCHEMA_ENABLED` off, these stand-ins return the view unchanged
+and the schema URLs are not routed either.
+"""
+
+from django.conf import settings
+
+
+def schema_enabled() -> bool:
+    return getattr(settings, "API_SCHEMA_ENABLED", settings.DEBUG)
+
+
+def _unchanged(view):
+    return view
+
+
+def extend_schema(*args, **kwargs):
+    if not schema_enabled():
+        return _unchanged
+    from drf_spectacular.utils import extend_schema as _extend_schema
+
+    return _extend_schema(*args, **kwargs)
+
+
+def extend_schema_view(**kwargs):
+    if not schema_enabled():
+        return _unchanged
+    from drf_spectacular.utils import extend_schema_view as _extend_schema_view
+
+    return _extend_schema_view(**kwargs)
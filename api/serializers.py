@@ -1,5 +1,67 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from django.db import transaction as dbtx
+from django.utils.dateparse import parse_date
 from rest_framework import serializers
-from accounting.models import Account, Journal
+from accounting.models import CENT, Account, EntryLine, Journal
+from accounting.services import create_and_post_transaction
+
+MONEY_PLACES = 2
+MONEY_MAX_DIGITS = 18
+
+
+def parse_money(value) -> Decimal:
+    """
+    Parse an amount with at most MONEY_MAX_DIGITS digits and MONEY_PLACES
+    decimals, quantized to cents. Raises ValueError with a DRF-style message.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, Decimal)):
+        raise ValueError("A valid number is required.")
+    try:
+        d = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError("A valid number is required.")
+    if not d.is_finite():
+        raise ValueError("A valid number is required.")
+    # digit counting, checks and messages as in DRF's DecimalField
+    _, digits, exponent = d.as_tuple()
+    if exponent >= 0:
+        total, places = len(digits) + exponent, 0
+    else:
+        places = -exponent
+        total = max(len(digits), places)
+    if total > MONEY_MAX_DIGITS:
+        raise ValueError(
+            f"Ensure that there are no more than {MONEY_MAX_DIGITS} digits in total."
+        )
+    if places > MONEY_PLACES:
+        raise ValueError(
+            f"Ensure that there are no more than {MONEY_PLACES} decimal places."
+        )
+    if total - places > MONEY_MAX_DIGITS - MONEY_PLACES:
+        raise ValueError(
+            "Ensure that there are no more than "
+            f"{MONEY_MAX_DIGITS - MONEY_PLACES} digits before the decimal point."
+        )
+    return d.quantize(CENT)
+
+
+class FastMoneyField(serializers.DecimalField):
+    """
+    DecimalField(18, 2) parsed in one pass by `parse_money` instead of DRF's
+    generic precision validation and quantize steps.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_PLACES, **kwargs
+        )
+
+    def to_internal_value(self, data):
+        try:
+            return parse_money(data)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -12,3 +74,228 @@ class JournalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Journal
         fields = ["id", "name", "description"]
+
+
+class EntryLineIn(serializers.Serializer):
+    account_code = serializers.CharField()
+    debit = FastMoneyField()
+    credit = FastMoneyField()
+    description = serializers.CharField(allow_blank=True, required=False)
+
+
+class TransactionIn(serializers.Serializer):
+    journal = serializers.CharField()
+    tx_date = serializers.DateField()
+    memo = serializers.CharField(allow_blank=True, required=False)
+    lines = EntryLineIn(many=True)
+
+    def create(self, validated):
+        return create_transaction(validated)
+
+
+def load_lookups(payloads):
+    """
+    Journals by name and accounts by code for validated payloads: one query
+    each for the whole batch, read fresh for every request.
+    """
+    names = {p["journal"] for p in payloads}
+    codes = {l["account_code"] for p in payloads for l in p["lines"]}
+    return (
+        Journal.objects.in_bulk(names, field_name="name"),
+        Account.objects.in_bulk(codes, field_name="code"),
+    )
+
+
+def resolve_transaction(validated, lookups=None):
+    """
+    Validated payload -> (journal, unsaved EntryLine objects). `lookups` is
+    `load_lookups(...)` over a batch that includes this payload.
+    """
+    journals, accs = lookups or load_lookups([validated])
+    j = journals.get(validated["journal"])
+    if j is None:
+        raise serializers.ValidationError(
+            {"journal": f"unknown journal: {validated['journal']}"}
+        )
+    codes = {l["account_code"] for l in validated["lines"]}
+    missing = sorted(codes - accs.keys())
+    if missing:
+        raise serializers.ValidationError(
+            {"lines": f"unknown codes: {', '.join(missing)}"}
+        )
+    line_objs = [
+        EntryLine(
+            account=accs[l["account_code"]],
+            debit=l["debit"],
+            credit=l["credit"],
+            description=l.get("description", ""),
+        )
+        for l in validated["lines"]
+    ]
+    return j, line_objs
+
+
+def create_transaction(validated):
+    with dbtx.atomic():
+        j, line_objs = resolve_transaction(validated)
+        return create_and_post_transaction(
+            journal=j,
+            tx_date=validated["tx_date"],
+            memo=validated.get("memo", ""),
+            line_objs=line_objs,
+        )
+
+
+_MISSING = object()
+
+
+def _present(value, required: bool) -> bool:
+    """DRF's required/null checks; False for an absent optional field."""
+    if value is _MISSING:
+        if required:
+            raise ValueError("This field is required.")
+        return False
+    if value is None:
+        raise ValueError("This field may not be null.")
+    return True
+
+
+def _text(value, *, required: bool = True, allow_blank: bool = False) -> str:
+    # Same coercion as CharField: numbers become strings, whitespace trimmed
+    if not _present(value, required):
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError("Not a valid string.")
+    value = str(value).strip()
+    if not value and not allow_blank:
+        raise ValueError("This field may not be blank.")
+    return value
+
+
+def _optional_text(value) -> str:
+    return _text(value, required=False, allow_blank=True)
+
+
+def _money(value) -> Decimal:
+    _present(value, True)
+    return parse_money(value)
+
+
+def _date(value) -> date:
+    _present(value, True)
+    if isinstance(value, datetime):
+        raise ValueError("Expected a date but got a datetime.")
+    if isinstance(value, date):
+        return value
+    try:
+        parsed = parse_date(value)
+    except (ValueError, TypeError):
+        parsed = None
+    if parsed is None:
+        raise ValueError(
+            "Date has wrong format. Use one of these formats instead: YYYY-MM-DD."
+        )
+    return parsed
+
+
+_TRANSACTION_FIELDS = (("journal", _text), ("tx_date", _date), ("memo", _optional_text))
+_LINE_FIELDS = (
+    ("account_code", _text),
+    ("debit", _money),
+    ("credit", _money),
+    ("description", _optional_text),
+)
+
+
+def _not_a_dict(data) -> dict:
+    return {
+        "non_field_errors": [
+            f"Invalid data. Expected a dictionary, but got {type(data).__name__}."
+        ]
+    }
+
+
+def _parse_fields(data: dict, fields, errors: dict) -> dict:
+    out = {}
+    for name, parse in fields:
+        try:
+            out[name] = parse(data.get(name, _MISSING))
+        except ValueError as e:
+            errors[name] = [str(e)]
+    return out
+
+
+def _parse_lines(raw, errors: dict) -> list:
+    try:
+        _present(raw, True)
+    except ValueError as e:
+        errors["lines"] = [str(e)]
+        return []
+    if not isinstance(raw, list):
+        errors["lines"] = {
+            "non_field_errors": [
+                f'Expected a list of items but got type "{type(raw).__name__}".'
+            ]
+        }
+        return []
+    lines, line_errors = [], []
+    for l in raw:
+        if not isinstance(l, dict):
+            line_errors.append(_not_a_dict(l))
+            continue
+        e = {}
+        lines.append(_parse_fields(l, _LINE_FIELDS, e))
+        line_errors.append(e)
+    if any(line_errors):
+        errors["lines"] = line_errors
+    return lines
+
+
+def validate_transaction_payload(data) -> dict:
+    """
+    Fast-path equivalent of `TransactionIn(data=...).is_valid()` for the POST
+    hot path: one pass over the payload with plain type checks, producing the
+    same `validated_data` shape and the same error messages and structure.
+    Raises serializers.ValidationError (400).
+    """
+    if not isinstance(data, dict):
+        raise serializers.ValidationError(_not_a_dict(data))
+    errors = {}
+    validated = _parse_fields(data, _TRANSACTION_FIELDS, errors)
+    validated["lines"] = _parse_lines(data.get("lines", _MISSING), errors)
+    if errors:
+        raise serializers.ValidationError(errors)
+    return validated
+
+
+class TransactionMinimalOut(serializers.Serializer):
+    id = serializers.IntegerField()
+    posted = serializers.BooleanField()
+    memo = serializers.CharField()
+
+
+class TransactionBulkIn(serializers.Serializer):
+    transactions = TransactionIn(many=True)
+
+
+class TransactionBulkOut(serializers.Serializer):
+    transactions = TransactionMinimalOut(many=True)
+
+
+class PredictIn(serializers.Serializer):
+    payee = serializers.CharField()
+    narrative = serializers.CharField(required=False, allow_blank=True)
+    amount = serializers.DecimalField(max_digits=18, decimal_places=2)
+
+
+class PredictOut(serializers.Serializer):
+    account_code = serializers.CharField()
+    confidence = serializers.FloatField()
+
+
+class PredictBulkIn(serializers.Serializer):
+    items = PredictIn(many=True)
+
+
+class PredictBulkOut(serializers.Serializer):
+    predictions = PredictOut(many=True)
@@ -1,21 +1,38 @@
+import json
 from decimal import Decimal
 from datetime import date
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from django.utils import timezone
 
-from accounting.models import Account, AccountType, Journal, Transaction
-from accounting.services import create_and_post_transaction
+from accounting.models import Account, AccountType, EntryLine, Journal, Transaction
+from accounting.services import (
+    create_and_post_transaction,
+    create_and_post_transactions,
+)
 from aiassist.local_model import MODEL_PATH
+from aiassist.services import reload_provider
 
 
 class APITests(TestCase):
     """API-level tests for prediction and transaction creation."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Ensure deterministic fallback behaviour for AI predictor
+        if MODEL_PATH.exists():
+            MODEL_PATH.unlink()
+        reload_provider()
+
     def setUp(self):
+        self.user = get_user_model().objects.create_user("loader", password="pw")
         self.client = APIClient()
+        self.client.force_authenticate(self.user)
         # Accounts & journal
         self.cash = Account.objects.create(
             code="1000", name="Cash", type=AccountType.ASSET, normal_debit=True
@@ -25,10 +42,6 @@ class APITests(TestCase):
         )
         self.journal = Journal.objects.create(name="GENERAL")
 
-        # Ensure deterministic fallback behaviour for AI predictor
-        if MODEL_PATH.exists():
-            MODEL_PATH.unlink()
-
     def test_predict_endpoint_fallback(self):
         url = reverse("predict-list")
         resp = self.client.post(
@@ -41,6 +54,61 @@ class APITests(TestCase):
         self.assertIn("confidence", resp.data)
         self.assertEqual(resp.data["account_code"], "5000")  # default fallback
 
+    def test_write_endpoints_require_token_or_session(self):
+        import base64
+
+        anon = APIClient()
+        url = reverse("predict-list")
+        payload = {"payee": "AMAZON EU", "amount": "12.99"}
+        resp = anon.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Basic auth is not accepted: it would hash the password per request
+        basic = base64.b64encode(b"loader:pw").decode()
+        resp = anon.post(
+            url, payload, format="json", HTTP_AUTHORIZATION=f"Basic {basic}"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # A browser session still works
+        session = APIClient()
+        session.login(username="loader", password="pw")
+        resp = session.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        creds = {"username": "loader", "password": "pw"}
+        resp = anon.post(reverse("api-token"), creds)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["token"], Token.objects.get(user=self.user).key)
+        anon.credentials(HTTP_AUTHORIZATION=f"Token {resp.data['token']}")
+        resp = anon.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_predict_bulk_endpoint(self):
+        items = [
+            {"payee": "AMAZON EU", "narrative": "cables", "amount": "12.99"},
+            {"payee": "STAPLES", "amount": "3.50"},
+        ]
+        resp = self.client.post(
+            reverse("predict-bulk"), {"items": items}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [p["account_code"] for p in resp.data["predictions"]], ["5000", "5000"]
+        )
+
+    def test_accounts_list_matches_serializer(self):
+        from api.serializers import AccountSerializer
+
+        resp = self.client.get(reverse("accounts-list"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        expected = AccountSerializer(Account.objects.order_by("code"), many=True).data
+        self.assertEqual([dict(r) for r in resp.data], [dict(r) for r in expected])
+
+    def test_account_codes(self):
+        resp = self.client.get(reverse("accounts-codes"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data, ["1000", "4000"])
+
     def test_transaction_serializer_creates_and_posts(self):
         from api.views import TransactionIn
 
@@ -88,6 +156,185 @@ class APITests(TestCase):
         with self.assertRaises(Exception):
             ser.save()
 
+    def test_fast_validator_matches_serializer(self):
+        from api.views import TransactionIn, validate_transaction_payload
+
+        payload = {
+            "journal": "GENERAL",
+            "tx_date": "2025-08-23",
+            "memo": "Sale",
+            "lines": [
+                {"account_code": "1000", "debit": "25.00", "credit": 0},
+                {"account_code": "4000", "debit": "0", "credit": 25.0},
+            ],
+        }
+        ser = TransactionIn(data=payload)
+        self.assertTrue(ser.is_valid(), ser.errors)
+        fast = validate_transaction_payload(payload)
+        self.assertEqual(fast["tx_date"], ser.validated_data["tx_date"])
+        for a, b in zip(fast["lines"], ser.validated_data["lines"]):
+            self.assertEqual(a["account_code"], b["account_code"])
+            self.assertEqual(a["debit"], b["debit"])
+            self.assertEqual(a["credit"], b["credit"])
+
+    def test_fast_validator_errors_match_serializer(self):
+        from rest_framework.exceptions import ValidationError
+        from api.views import TransactionIn, validate_transaction_payload
+
+        def plain(detail):
+            if isinstance(detail, dict):
+                return {k: plain(v) for k, v in detail.items()}
+            if isinstance(detail, list):
+                return [plain(v) for v in detail]
+            return str(detail)
+
+        ok = {"account_code": "4000", "debit": "0", "credit": "1.00"}
+        base = {"journal": "GENERAL", "tx_date": "2025-08-23", "lines": [ok]}
+        payloads = [
+            {},
+            "abc",
+            {**base, "journal": " "},
+            {**base, "tx_date": "23/08/2025"},
+            {**base, "lines": "x"},
+            {**base, "lines": [ok, 5]},
+            {**base, "lines": [{"account_code": "1000", "credit": "1.00"}, ok]},
+            {**base, "lines": [{**ok, "account_code": None}]},
+            {**base, "lines": [{**ok, "debit": "1.005"}]},
+            {**base, "lines": [{**ok, "debit": "12345678901234567"}]},
+            {**base, "lines": [{**ok, "credit": "abc"}]},
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                ser = TransactionIn(data=payload)
+                self.assertFalse(ser.is_valid())
+                with self.assertRaises(ValidationError) as cm:
+                    validate_transaction_payload(payload)
+                self.assertEqual(plain(cm.exception.detail), plain(ser.errors))
+
+    def test_fast_validator_coerces_like_serializer(self):
+        from api.views import TransactionIn, validate_transaction_payload
+
+        payload = {
+            "journal": 123,
+            "tx_date": "2025-08-23",
+            "lines": [{"account_code": 1000, "debit": 1, "credit": "0"}],
+        }
+        ser = TransactionIn(data=payload)
+        self.assertTrue(ser.is_valid(), ser.errors)
+        fast = validate_transaction_payload(payload)
+        self.assertEqual(fast["journal"], ser.validated_data["journal"])
+        self.assertEqual(
+            fast["lines"][0]["account_code"],
+            ser.validated_data["lines"][0]["account_code"],
+        )
+
+    def test_transaction_endpoint_rejects_unbalanced(self):
+        url = reverse("transactions-list")
+        payload = {
+            "journal": "GENERAL",
+            "tx_date": "2025-08-23",
+            "lines": [
+                {"account_code": "1000", "debit": "10.00", "credit": "0.00"},
+                {"account_code": "4000", "debit": "0.00", "credit": "9.00"},
+            ],
+        }
+        resp = self.client.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", resp.data)
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_transaction_endpoint_rejects_bad_amount(self):
+        url = reverse("transactions-list")
+        payload = {
+            "journal": "GENERAL",
+            "tx_date": "2025-08-23",
+            "lines": [
+                {"account_code": "1000", "debit": "1.005", "credit": "0.00"},
+                {"account_code": "4000", "debit": "0.00", "credit": "1.00"},
+            ],
+        }
+        resp = self.client.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("lines", resp.data)
+
+    def test_bulk_endpoint_creates_all_or_nothing(self):
+        url = reverse("transactions-bulk")
+
+        def tx(memo, amount):
+            return {
+                "journal": "GENERAL",
+                "tx_date": "2025-08-23",
+                "memo": memo,
+                "lines": [
+                    {"account_code": "1000", "debit": amount, "credit": "0.00"},
+                    {"account_code": "4000", "debit": "0.00", "credit": amount},
+                ],
+            }
+
+        resp = self.client.post(
+            url, {"transactions": [tx("A", "10.00"), tx("B", "20.00")]}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual([t["memo"] for t in resp.data["transactions"]], ["A", "B"])
+        self.assertEqual(Transaction.objects.filter(posted=True).count(), 2)
+        self.assertEqual(EntryLine.objects.count(), 4)
+
+        bad = tx("C", "5.00")
+        bad["lines"][1]["credit"] = "4.00"
+        resp = self.client.post(
+            url, {"transactions": [tx("D", "1.00"), bad]}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+        # Per-item errors are keyed by the item's index
+        bad_amount = tx("E", "1.005")
+        unknown = tx("F", "1.00")
+        unknown["lines"][0]["account_code"] = "9999"
+        for items, index in [
+            ([tx("G", "1.00"), bad_amount], "1"),
+            ([unknown, tx("H", "1.00")], "0"),
+        ]:
+            resp = self.client.post(url, {"transactions": items}, format="json")
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(list(json.loads(resp.content)["transactions"]), [index])
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_transaction_rejects_unknown_account_code(self):
+        url = reverse("transactions-list")
+        payload = {
+            "journal": "GENERAL",
+            "tx_date": "2025-08-23",
+            "lines": [
+                {"account_code": "1000", "debit": "10.00", "credit": "0.00"},
+                {"account_code": "9999", "debit": "0.00", "credit": "10.00"},
+            ],
+        }
+        resp = self.client.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("9999", str(resp.data["lines"]))
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_account_codes_resolved_from_current_rows(self):
+        from api.serializers import resolve_transaction
+
+        payload = {
+            "journal": "GENERAL",
+            "lines": [
+                {"account_code": "1000", "debit": "5.00", "credit": "0.00"},
+                {"account_code": "4000", "debit": "0.00", "credit": "5.00"},
+            ],
+        }
+        _, lines = resolve_transaction(payload)
+        self.assertEqual(lines[0].account, self.cash)
+        # Code reused, e.g. by another worker: no signal reaches this process
+        Account.objects.filter(pk=self.cash.pk).update(code="1001")
+        bank = Account.objects.create(
+            code="1000", name="Bank", type=AccountType.ASSET, normal_debit=True
+        )
+        _, lines = resolve_transaction(payload)
+        self.assertEqual(lines[0].account, bank)
+
 
 class ReportTests(TestCase):
     """Simple integration tests for reporting endpoints."""
@@ -147,9 +394,10 @@ class ReportTests(TestCase):
         url = reverse("report-income-statement") + "?from=2025-08-01&to=2025-08-31"
         r = self.client.get(url)
         self.assertEqual(r.status_code, status.HTTP_200_OK)
-        self.assertEqual(Decimal(r.data["totals"]["income"]), Decimal("100.00"))
-        self.assertEqual(Decimal(r.data["totals"]["expense"]), Decimal("30.00"))
-        self.assertEqual(Decimal(r.data["totals"]["net_income"]), Decimal("70.00"))
+        self.assertEqual(
+            r.data["totals"],
+            {"income": "100.00", "expense": "30.00", "net_income": "70.00"},
+        )
 
     def test_balance_sheet(self):
         url = reverse("report-balance-sheet") + "?as_of=2025-08-31"
@@ -158,6 +406,46 @@ class ReportTests(TestCase):
         totals = r.data["totals"]
         self.assertTrue(totals.get("balanced", False))
 
+    def test_report_cache_invalidated_by_posting(self):
+        url = reverse("report-trial-balance") + "?as_of=2025-08-31"
+        self.assertEqual(self.client.get(url).data["totals"]["debit"], "100.00")
+        create_and_post_transaction(
+            journal=self.journal,
+            tx_date=date(2025, 8, 12),
+            memo="Sale 50",
+            lines=[
+                {"account": self.bank, "debit": Decimal("50.00"), "credit": 0},
+                {"account": self.sales, "debit": 0, "credit": Decimal("50.00")},
+            ],
+        )
+        self.assertEqual(self.client.get(url).data["totals"]["debit"], "150.00")
+
+    def test_report_cache_invalidated_by_bulk_posting(self):
+        url = reverse("report-balance-sheet") + "?as_of=2025-08-31"
+        self.assertEqual(self.client.get(url).data["assets"][0]["amount"], "70.00")
+        create_and_post_transactions(
+            [
+                {
+                    "journal": self.journal,
+                    "tx_date": date(2025, 8, 12),
+                    "memo": "Sale 50",
+                    "line_objs": [
+                        EntryLine(account=self.bank, debit=Decimal("50.00")),
+                        EntryLine(account=self.sales, credit=Decimal("50.00")),
+                    ],
+                }
+            ]
+        )
+        self.assertEqual(self.client.get(url).data["assets"][0]["amount"], "120.00")
+
+    def test_streamed_report_matches_response(self):
+        url = reverse("report-balance-sheet") + "?as_of=2025-08-31"
+        r = self.client.get(url + "&stream=1")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertTrue(r.streaming)
+        streamed = json.loads(b"".join(r.streaming_content))
+        self.assertEqual(streamed, json.loads(self.client.get(url).content))
+
 
 class TrialBalanceTests(TestCase):
     def setUp(self):
@@ -169,10 +457,10 @@ class TrialBalanceTests(TestCase):
             code="4000", name="Sales", type=AccountType.INCOME, normal_debit=False
         )
         create_and_post_transaction(
-            self.j,
-            date(2025, 8, 10),
-            "Sale 100",
-            [
+            journal=self.j,
+            tx_date=date(2025, 8, 10),
+            memo="Sale 100",
+            lines=[
                 {"account": self.bank, "debit": Decimal("100.00"), "credit": 0},
                 {"account": self.sales, "debit": 0, "credit": Decimal("100.00")},
             ],
@@ -191,3 +479,11 @@ class TrialBalanceTests(TestCase):
         r = self.client.get(url)
         self.assertEqual(r.status_code, 200)
         self.assertTrue(r.data["totals"]["balanced"])
+        self.assertEqual(r.data["rows"][0]["debit"], "100.00")
+
+    def test_tb_period_stream(self):
+        url = reverse("report-trial-balance") + "?from=2025-08-01&to=2025-08-31"
+        r = self.client.get(url + "&stream=1")
+        data = json.loads(b"".join(r.streaming_content))
+        self.assertEqual(data, json.loads(self.client.get(url).content))
+        self.assertEqual([row["code"] for row in data["rows"]], ["1100", "4000"])
@@ -1,15 +1,18 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework.routers import SimpleRouter
 from .views import PredictView, AccountViewSet, TransactionView, JournalViewSet
 from .report_views import income_statement_view, balance_sheet_view, trial_balance_view
 
-router = DefaultRouter()
+router = SimpleRouter()
 router.register(r"predict", PredictView, basename="predict")
 router.register(r"accounts", AccountViewSet, basename="accounts")
 router.register(r"transactions", TransactionView, basename="transactions")
 router.register(r"journals", JournalViewSet, basename="journals")
 urlpatterns = [
     path("", include(router.urls)),
+    # POST username/password once, then send "Authorization: Token <key>"
+    path("token/", obtain_auth_token, name="api-token"),
     path(
         "reports/income-statement/",
         income_statement_view,
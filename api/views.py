@@ -1,18 +1,36 @@
 # api/views.py
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import mixins, serializers, viewsets, status
+from rest_framework.authentication import (
+    SessionAuthentication,
+    TokenAuthentication,
+)
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from accounting.models import Account, Transaction, EntryLine, Journal
-from accounting.services import create_and_post_transaction
-from aiassist.services import predict_account_code
-from .serializers import AccountSerializer, JournalSerializer
+from accounting.models import Account, Journal
+from accounting.services import create_and_post_transactions
+from aiassist.services import predict_account_code, predict_account_codes
+from .serializers import (
+    AccountSerializer,
+    JournalSerializer,
+    PredictBulkIn,
+    PredictBulkOut,
+    PredictIn,
+    PredictOut,
+    TransactionBulkIn,
+    TransactionBulkOut,
+    TransactionIn,
+    TransactionMinimalOut,
+    create_transaction,
+    load_lookups,
+    resolve_transaction,
+    validate_transaction_payload,
+)
 
 # --- drf-spectacular imports ---
-from drf_spectacular.utils import (
-    extend_schema,
-    extend_schema_view,
-    OpenApiTypes,
-    OpenApiExample,
-)
+from drf_spectacular.utils import OpenApiTypes, OpenApiExample
+from .schema import extend_schema, extend_schema_view
 
 
 # ======================
@@ -41,11 +59,31 @@ from drf_spectacular.utils import (
             )
         ],
     ),
+    codes=extend_schema(
+        summary="List account codes",
+        description="Return just the account codes, as a flat list of strings.",
+        responses={200: serializers.ListField(child=serializers.CharField())},
+        tags=["Accounts"],
+        operation_id="accounts_codes",
+    ),
 )
 class AccountViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Account.objects.all().order_by("code")
     serializer_class = AccountSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Plain column dicts: no model instances, no per-field serializer work
+        rows = self.get_queryset().values(*AccountSerializer.Meta.fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(list(page))
+        return Response(list(rows))
+
+    @action(detail=False, methods=["get"])
+    def codes(self, request):
+        # One column, no pagination: for clients that only check existence
+        return Response(list(self.get_queryset().values_list("code", flat=True)))
+
 
 # ======================
 # Journals (create)
@@ -85,51 +123,18 @@ class JournalViewSet(
 # ======================
 # Transactions (create)
 # ======================
-class EntryLineIn(serializers.Serializer):
-    account_code = serializers.CharField()
-    debit = serializers.DecimalField(max_digits=18, decimal_places=2)
-    credit = serializers.DecimalField(max_digits=18, decimal_places=2)
-    description = serializers.CharField(allow_blank=True, required=False)
-
-
-class TransactionIn(serializers.Serializer):
-    journal = serializers.CharField()
-    tx_date = serializers.DateField()
-    memo = serializers.CharField(allow_blank=True, required=False)
-    lines = EntryLineIn(many=True)
-
-    def create(self, validated):
-        j = Journal.objects.get(name=validated["journal"])
-        lines = []
-        for l in validated["lines"]:
-            acc = Account.objects.get(code=l["account_code"])
-            lines.append(
-                {
-                    "account": acc,
-                    "debit": l["debit"],
-                    "credit": l["credit"],
-                    "description": l.get("description", ""),
-                }
-            )
-        return create_and_post_transaction(
-            journal=j,
-            tx_date=validated["tx_date"],
-            memo=validated.get("memo", ""),
-            lines=lines,
-        )
-
-
-class TransactionMinimalOut(serializers.Serializer):
-    id = serializers.IntegerField()
-    posted = serializers.BooleanField()
-    memo = serializers.CharField()
-
-
 class TransactionView(viewsets.ViewSet):
     """
-    POST /api/transactions/  -> create & post a transaction
+    POST /api/transactions/       -> create & post a transaction
+    POST /api/transactions/bulk/  -> create & post many in one DB transaction
     """
 
+    # Write path for loaders/integrations: a token costs one indexed lookup
+    # instead of a password hash check per request, so Basic auth is off.
+    # Browser sessions (browsable API, admin users) still work.
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated,)
+
     @extend_schema(
         summary="Create & post a transaction",
         description="Creates a balanced journal entry (≥2 lines) and posts it atomically.",
@@ -169,28 +174,74 @@ class TransactionView(viewsets.ViewSet):
         ],
     )
     def create(self, request):
-        s = TransactionIn(data=request.data)
-        s.is_valid(raise_exception=True)
-        tx = s.save()
+        # TransactionIn documents the payload; validation skips DRF fields
+        validated = validate_transaction_payload(request.data)
+        try:
+            tx = create_transaction(validated)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"non_field_errors": e.messages})
+        # TransactionMinimalOut only documents this shape for the schema
         return Response(
-            TransactionMinimalOut(tx.__dict__).data, status=status.HTTP_200_OK
+            {"id": tx.id, "posted": tx.posted, "memo": tx.memo},
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        summary="Create & post many transactions",
+        description="All-or-nothing: every transaction is validated before any "
+        "is written, then all are inserted in one database transaction.",
+        request=TransactionBulkIn,
+        responses={200: TransactionBulkOut},
+        tags=["Transactions"],
+        operation_id="transactions_bulk_create",
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        data = request.data
+        items = data.get("transactions") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise serializers.ValidationError(
+                {"transactions": "Expected a list of transactions."}
+            )
+        validated_items = []
+        for i, item in enumerate(items):
+            try:
+                validated_items.append(validate_transaction_payload(item))
+            except serializers.ValidationError as e:
+                raise serializers.ValidationError({"transactions": {str(i): e.detail}})
+        # One journal and one account query for the whole batch
+        lookups = load_lookups(validated_items)
+        specs = []
+        for i, validated in enumerate(validated_items):
+            try:
+                j, line_objs = resolve_transaction(validated, lookups)
+            except serializers.ValidationError as e:
+                raise serializers.ValidationError({"transactions": {str(i): e.detail}})
+            specs.append(
+                {
+                    "journal": j,
+                    "tx_date": validated["tx_date"],
+                    "memo": validated["memo"],
+                    "line_objs": line_objs,
+                }
+            )
+        try:
+            txs = create_and_post_transactions(specs)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"transactions": e.messages})
+        return Response(
+            {
+                "transactions": [
+                    {"id": tx.id, "posted": tx.posted, "memo": tx.memo} for tx in txs
+                ]
+            },
+            status=status.HTTP_200_OK,
         )
 
 
 # ======================
 # Predict (create)
 # ======================
-class PredictIn(serializers.Serializer):
-    payee = serializers.CharField()
-    narrative = serializers.CharField(required=False, allow_blank=True)
-    amount = serializers.DecimalField(max_digits=18, decimal_places=2)
-
-
-class PredictOut(serializers.Serializer):
-    account_code = serializers.CharField()
-    confidence = serializers.FloatField()
-
-
 @extend_schema_view(
     create=extend_schema(
         summary="Predict account code",
@@ -218,8 +269,33 @@ class PredictOut(serializers.Serializer):
     )
 )
 class PredictView(viewsets.ViewSet):
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated,)
+
     def create(self, request):
         s = PredictIn(data=request.data)
         s.is_valid(raise_exception=True)
         code, prob = predict_account_code(**s.validated_data)
         return Response({"account_code": code, "confidence": prob})
+
+    @extend_schema(
+        summary="Predict account codes for many lines",
+        description="Same as the single prediction, but scores all items in one "
+        "model call; predictions are returned in item order.",
+        request=PredictBulkIn,
+        responses={200: PredictBulkOut},
+        tags=["AI"],
+        operation_id="predict_bulk_create",
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        s = PredictBulkIn(data=request.data)
+        s.is_valid(raise_exception=True)
+        results = predict_account_codes(s.validated_data["items"])
+        return Response(
+            {
+                "predictions": [
+                    {"account_code": code, "confidence": prob} for code, prob in results
+                ]
+            }
+        )
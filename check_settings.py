@@ -1,9 +1,23 @@
-import os, sys, importlib, django
+import os, sys, importlib.util
+
+# Shallow by default: locating the settings module is enough to diagnose
+# paths, and skips importing Django and every app (ML libs included).
+# --deep loads settings, runs django.setup() and imports `accounting`.
+deep = "--deep" in sys.argv[1:]
 
 print("CWD:", os.getcwd())
 print("Python:", sys.executable)
 print("DJANGO_SETTINGS_MODULE:", os.environ.get("DJANGO_SETTINGS_MODULE"))
 try:
+    spec = importlib.util.find_spec("ledger_proj.settings")
+    if spec is None:
+        raise ImportError("ledger_proj.settings not found on sys.path")
+    print("Found settings:", spec.origin)
+    if not deep:
+        print("Run with --deep to load settings and apps.")
+        sys.exit(0)
+
+    import django
     import ledger_proj.settings as s
 
     print("Loaded settings OK.")
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.admin.apps import AdminConfig
+
+
+class LedgerAdminConfig(AdminConfig):
+    """django.contrib.admin with the site header/title taken from settings."""
+
+    def ready(self):
+        super().ready()
+        from django.contrib import admin
+
+        admin.site.site_header = getattr(settings, "ADMIN_SITE_HEADER", "Admin")
+        admin.site.site_title = getattr(settings, "ADMIN_SITE_TITLE", "Admin")
@@ -41,7 +41,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    "ledger_proj.apps.LedgerAdminConfig",  # django.contrib.admin + site titles
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -98,6 +98,13 @@ DATABASES = {
     "default": env.db(),
 }
 
+# Cached reports and the ledger version that invalidates them. With several
+# workers point this at a shared cache (e.g. CACHE_URL=rediscache://...);
+# the local-memory default only sees writes made in the same process.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+# Upper bound, in seconds, on how long a cached report is served
+REPORT_CACHE_TIMEOUT = env.int("REPORT_CACHE_TIMEOUT", default=30)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -142,12 +149,23 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 ADMIN_SITE_HEADER = "Ledger Admin"
 ADMIN_SITE_TITLE = "Ledger"
 
-INSTALLED_APPS += ["rest_framework", "drf_spectacular"]
+# Load the categorizer model when the app starts (web workers) rather than
+# on the first prediction request
+AI_PRELOAD_MODEL = env.bool("AI_PRELOAD_MODEL", default=False)
+
+INSTALLED_APPS += ["rest_framework", "rest_framework.authtoken", "drf_spectacular"]
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     # keep your existing authentication/permission config
 }
+# OpenAPI schema decorators and the /api/schema/ + /api/docs/ routes
+API_SCHEMA_ENABLED = env.bool("API_SCHEMA_ENABLED", default=DEBUG)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Ledger API",
     "DESCRIPTION": "Double-entry accounting API with AI assist",
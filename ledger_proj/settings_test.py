@@ -0,0 +1,19 @@
+"""
+Settings for running the test suite against an in-memory SQLite database:
+
+    python manage.py test --settings=ledger_proj.settings_test
+"""
+
+import os
+
+# settings.py reads DATABASE_URL unconditionally; tests don't need one
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+
+from .settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
@@ -17,20 +17,17 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from api.views import PredictView  # plus your Transaction/Account viewsets if defined
-
-# Customize the admin site header/title
-admin.site.site_header = "Ledger Admin"
-admin.site.site_title = "Ledger"
-
-router = DefaultRouter()
-router.register(r"predict", PredictView, basename="predict")
+from api.schema import schema_enabled
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
     path("api/", include("api.urls")),
 ]
+
+if schema_enabled():
+    from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+    urlpatterns += [
+        path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+        path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
+    ]
@@ -5,21 +5,37 @@ Load the transactions described in:
   https://martin.kleppmann.com/2011/03/07/accounting-for-computer-scientists.html
 
 This script calls the DRF endpoint: POST {API}/api/transactions/
-and creates the example transactions in the specified journal.
+(or, with --bulk, POST {API}/api/transactions/bulk/ once)
+and creates the example transactions in the specified journal. The single
+POSTs are sent concurrently over one HTTP/2 connection (--serial sends them
+one at a time).
+
+The transaction endpoints take token auth, not Basic: pass --token (or set
+LEDGER_API_TOKEN), or --user/--password to fetch the token from
+{API}/api/token/ once.
 
 Usage:
-  python load_kleppmann_example.py --api http://localhost:8008 --user alice --password secret [--journal General]
+  python load_kleppmann_example.py --api http://localhost:8008 --user alice --password secret [--journal General] [--bulk | --serial]
+  python load_kleppmann_example.py --api http://localhost:8008 --token <key>
 
 Prereqs:
   - Your API is running and reachable.
   - Accounts with the codes below exist (or adjust to yours).
+  - Optional: `pip install ijson` to stream-parse a large chart of accounts.
 """
 
 import argparse
+import asyncio
+import os
 import sys
-import requests
+import httpx
 from datetime import date
 
+try:
+    import ijson
+except ImportError:  # optional, see must_have_accounts
+    ijson = None
+
 # ---- Adjust these if your codes differ ----
 ACCOUNTS = {
     "BANK": "1100",  # Asset
@@ -34,251 +50,240 @@ ACCOUNTS = {
 }
 
 
-def must_have_accounts(api, auth):
-    """Fetch /api/accounts/ and ensure all required codes exist."""
-    url = f"{api.rstrip('/')}/api/accounts/?page_size=10000"
-    r = requests.get(url, auth=auth, timeout=30)
+async def _stream_codes(client, url):
+    """Collect the codes while the body downloads, never holding the full list."""
+    got, items = set(), ijson.sendable_list()
+    parser = ijson.items_coro(items, "item")
+    async with client.stream("GET", url, timeout=30) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_bytes():
+            parser.send(chunk)
+            got.update(c for c in items if isinstance(c, str))
+            del items[:]
+    parser.close()
+    got.update(c for c in items if isinstance(c, str))
+    return got
+
+
+async def must_have_accounts(client, api):
+    """Fetch /api/accounts/codes/ and ensure all required codes exist."""
+    url = f"{api.rstrip('/')}/api/accounts/codes/"
+    if ijson is not None:
+        try:
+            got = await _stream_codes(client, url)
+        except ijson.JSONError:
+            raise RuntimeError("Accounts endpoint did not return a list of codes")
+        return [code for code in ACCOUNTS.values() if code not in got]
+
+    r = await client.get(url, timeout=30)
     r.raise_for_status()
     try:
-        data = r.json()
-    except ValueError:
-        raise RuntimeError("Accounts endpoint did not return valid JSON")
+        got = {c for c in r.json() if isinstance(c, str)}
+    except (ValueError, TypeError):
+        raise RuntimeError("Accounts endpoint did not return a list of codes")
 
-    # Support DRF paginated responses (dict with 'results') and plain list responses
-    if isinstance(data, dict):
-        entries = data.get("results") if "results" in data else data.get("data", None)
-        # If still None, the dict might itself be a single account or unexpected shape
-        if entries is None:
-            # try interpreting the dict as a mapping of code->... or fail fast
-            # collect any nested dicts that look like account entries
-            possible = []
-            for v in data.values():
-                if isinstance(v, list):
-                    possible.extend(v)
-            if possible:
-                entries = possible
-            else:
-                raise RuntimeError("Unexpected JSON shape from accounts endpoint")
-    elif isinstance(data, list):
-        entries = data
-    else:
-        raise RuntimeError("Unexpected JSON type from accounts endpoint")
+    return [code for code in ACCOUNTS.values() if code not in got]
 
-    got = set()
-    for a in entries:
-        if isinstance(a, dict) and "code" in a:
-            got.add(a["code"])
 
-    missing = [code for code in ACCOUNTS.values() if code not in got]
-    return missing
+async def fetch_token(client, api, user, password):
+    """Exchange username/password for the user's API token (one password check)."""
+    url = f"{api.rstrip('/')}/api/token/"
+    r = await client.post(url, data={"username": user, "password": password})
+    if r.status_code >= 400:
+        raise RuntimeError(f"Token request failed {r.status_code}: {r.text}")
+    return r.json()["token"]
 
 
-def post_tx(api, auth, journal, tx_date, memo, lines):
-    """POST one transaction."""
+async def post_tx(client, api, base_payload, memo, lines):
+    """POST one transaction; base_payload carries the shared journal/tx_date."""
     url = f"{api.rstrip('/')}/api/transactions/"
+    payload = {**base_payload, "memo": memo, "lines": lines}
+    r = await client.post(url, json=payload, timeout=30)
+    if r.status_code >= 400:
+        raise RuntimeError(f"POST failed {r.status_code}: {r.text}")
+    return r.json()
+
+
+async def post_bulk(client, api, base_payload, entries):
+    """POST all (memo, lines) entries in one request; all-or-nothing."""
+    url = f"{api.rstrip('/')}/api/transactions/bulk/"
     payload = {
-        "journal": journal,
-        "tx_date": tx_date.isoformat(),
-        "memo": memo,
-        "lines": lines,
+        "transactions": [
+            {**base_payload, "memo": memo, "lines": lines} for memo, lines in entries
+        ]
     }
-    r = requests.post(url, json=payload, auth=auth, timeout=30)
+    r = await client.post(url, json=payload, timeout=60)
     if r.status_code >= 400:
         raise RuntimeError(f"POST failed {r.status_code}: {r.text}")
-    return r.json()
+    return r.json()["transactions"]
+
+
+async def load(args, base_payload, entries):
+    # One client (one HTTP/2 connection, one auth header) for every request
+    async with httpx.AsyncClient(http2=True) as client:
+        token = args.token or await fetch_token(
+            client, args.api, args.user, args.password
+        )
+        client.headers["Authorization"] = f"Token {token}"
+        # 1) Preflight: ensure accounts exist
+        missing = await must_have_accounts(client, args.api)
+        if missing:
+            print(
+                "ERROR: The following required account codes are missing in your CoA:"
+            )
+            print("  " + ", ".join(missing))
+            print(
+                "Create them in Admin (or change the mapping in this script), "
+                "then re-run."
+            )
+            sys.exit(2)
+
+        # 2) Post the entries
+        if args.bulk:
+            return await post_bulk(client, args.api, base_payload, entries)
+        posts = (post_tx(client, args.api, base_payload, *e) for e in entries)
+        if args.serial:
+            return [await p for p in posts]
+        # The entries are independent, so they are multiplexed on the one
+        # connection; gather() still returns the results in entry order
+        return await asyncio.gather(*posts)
 
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--api", required=True, help="Base URL, e.g. http://localhost:8008")
-    p.add_argument("--user", required=True)
-    p.add_argument("--password", required=True)
+    p.add_argument(
+        "--token",
+        default=os.environ.get("LEDGER_API_TOKEN"),
+        help="API token (default: $LEDGER_API_TOKEN); else use --user/--password",
+    )
+    p.add_argument("--user")
+    p.add_argument("--password")
     p.add_argument("--journal", default="General")
     p.add_argument(
         "--date",
         default=date.today().isoformat(),
         help="Posting date (YYYY-MM-DD) used for all entries",
     )
+    p.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Send all entries in one request to /api/transactions/bulk/",
+    )
+    p.add_argument(
+        "--serial",
+        action="store_true",
+        help="Post the entries one after another instead of concurrently "
+        "(easier to debug)",
+    )
     args = p.parse_args()
+    if not args.token and not (args.user and args.password):
+        p.error("pass --token, or both --user and --password")
 
-    auth = (args.user, args.password)
-    # 1) Preflight: ensure accounts exist
-    missing = must_have_accounts(args.api, auth)
-    if missing:
-        print("ERROR: The following required account codes are missing in your CoA:")
-        print("  " + ", ".join(missing))
-        print(
-            "Create them in Admin (or change the mapping in this script), then re-run."
-        )
-        sys.exit(2)
-
+    # Amounts are given as the API's decimal strings, so nothing is formatted
+    # per line and the server parses them as-is
     D = lambda code, amt, desc="": {
         "account_code": code,
-        "debit": f"{amt:.2f}",
+        "debit": amt,
         "credit": "0.00",
         "description": desc,
     }
     C = lambda code, amt, desc="": {
         "account_code": code,
         "debit": "0.00",
-        "credit": f"{amt:.2f}",
+        "credit": amt,
         "description": desc,
     }
     day = date.fromisoformat(args.date)
 
-    created = []
-
-    # --- Transactions per the article ---
-
-    # 1) Buy bagel $5 on company credit card (expense via card) [FOOD, CREDIT_CARD]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+    entries = [
+        # --- Transactions per the article ---
+        # 1) Buy bagel $5 on company credit card (expense via card) [FOOD, CREDIT_CARD]
+        (
             "Bagel on company credit card ($5)",
             [
-                D(ACCOUNTS["FOOD"], 5.00, "bagel"),
-                C(ACCOUNTS["CREDIT_CARD"], 5.00, "bagel"),
+                D(ACCOUNTS["FOOD"], "5.00", "bagel"),
+                C(ACCOUNTS["CREDIT_CARD"], "5.00", "bagel"),
             ],
-        )
-    )
-
-    # 2) Buy chair $500 by cheque from the company bank account (asset purchase) [FURNITURE, BANK]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 2) Buy chair $500 by cheque from the company bank account (asset purchase) [FURNITURE, BANK]
+        (
             "Aeron chair paid from bank ($500)",
             [
-                D(ACCOUNTS["FURNITURE"], 500.00, "chair"),
-                C(ACCOUNTS["BANK"], 500.00, "chair"),
+                D(ACCOUNTS["FURNITURE"], "500.00", "chair"),
+                C(ACCOUNTS["BANK"], "500.00", "chair"),
             ],
-        )
-    )
-
-    # 3) Pay the $5 credit card bill from the bank [CREDIT_CARD, BANK]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 3) Pay the $5 credit card bill from the bank [CREDIT_CARD, BANK]
+        (
             "Pay credit card bill ($5)",
             [
-                D(ACCOUNTS["CREDIT_CARD"], 5.00, "card bill"),
-                C(ACCOUNTS["BANK"], 5.00, "card bill"),
+                D(ACCOUNTS["CREDIT_CARD"], "5.00", "card bill"),
+                C(ACCOUNTS["BANK"], "5.00", "card bill"),
             ],
-        )
-    )
-
-    # 4) Founder puts $5,000 to start the company (capital) [BANK, CAPITAL]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 4) Founder puts $5,000 to start the company (capital) [BANK, CAPITAL]
+        (
             "Founder capital $5,000",
             [
-                D(ACCOUNTS["BANK"], 5000.00, "founder capital"),
-                C(ACCOUNTS["CAPITAL"], 5000.00, "founder capital"),
+                D(ACCOUNTS["BANK"], "5000.00", "founder capital"),
+                C(ACCOUNTS["CAPITAL"], "5000.00", "founder capital"),
             ],
-        )
-    )
-
-    # 5) Customer 1 sale $5,000, paid immediately [BANK, SALES]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 5) Customer 1 sale $5,000, paid immediately [BANK, SALES]
+        (
             "Customer 1 sale, paid immediately ($5,000)",
             [
-                D(ACCOUNTS["BANK"], 5000.00, "sale C1"),
-                C(ACCOUNTS["SALES"], 5000.00, "sale C1"),
+                D(ACCOUNTS["BANK"], "5000.00", "sale C1"),
+                C(ACCOUNTS["SALES"], "5000.00", "sale C1"),
             ],
-        )
-    )
-
-    # 6) Customer 2: sell $5,000 on credit (A/R), then take $2,500 upfront
-    # 6a) Recognize the sale on credit [DEBTORS, SALES]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 6) Customer 2: sell $5,000 on credit (A/R), then take $2,500 upfront
+        # 6a) Recognize the sale on credit [DEBTORS, SALES]
+        (
             "Customer 2 sale on credit ($5,000)",
             [
-                D(ACCOUNTS["DEBTORS"], 5000.00, "sale C2"),
-                C(ACCOUNTS["SALES"], 5000.00, "sale C2"),
+                D(ACCOUNTS["DEBTORS"], "5000.00", "sale C2"),
+                C(ACCOUNTS["SALES"], "5000.00", "sale C2"),
             ],
-        )
-    )
-    # 6b) Receive partial payment $2,500 [BANK, DEBTORS]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 6b) Receive partial payment $2,500 [BANK, DEBTORS]
+        (
             "Customer 2 partial payment ($2,500)",
             [
-                D(ACCOUNTS["BANK"], 2500.00, "C2 upfront"),
-                C(ACCOUNTS["DEBTORS"], 2500.00, "C2 upfront"),
+                D(ACCOUNTS["BANK"], "2500.00", "C2 upfront"),
+                C(ACCOUNTS["DEBTORS"], "2500.00", "C2 upfront"),
             ],
-        )
-    )
-
-    # 7) YC investment $20,000 (equity) [BANK, CAPITAL]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 7) YC investment $20,000 (equity) [BANK, CAPITAL]
+        (
             "YC investment $20,000",
             [
-                D(ACCOUNTS["BANK"], 20000.00, "YC"),
-                C(ACCOUNTS["CAPITAL"], 20000.00, "YC"),
+                D(ACCOUNTS["BANK"], "20000.00", "YC"),
+                C(ACCOUNTS["CAPITAL"], "20000.00", "YC"),
             ],
-        )
-    )
-
-    # 8) Payroll (salary) $8,000 paid out of bank [PAYROLL, BANK]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 8) Payroll (salary) $8,000 paid out of bank [PAYROLL, BANK]
+        (
             "Payroll $8,000",
             [
-                D(ACCOUNTS["PAYROLL"], 8000.00, "salary"),
-                C(ACCOUNTS["BANK"], 8000.00, "salary"),
+                D(ACCOUNTS["PAYROLL"], "8000.00", "salary"),
+                C(ACCOUNTS["BANK"], "8000.00", "salary"),
             ],
-        )
-    )
-
-    # 9) Depreciation: one year on $500 chair -> $125 [DEPRECIATION, FURNITURE]
-    created.append(
-        post_tx(
-            args.api,
-            auth,
-            args.journal,
-            day,
+        ),
+        # 9) Depreciation: one year on $500 chair -> $125 [DEPRECIATION, FURNITURE]
+        (
             "Depreciation of chair (1 year) $125",
             [
-                D(ACCOUNTS["DEPRECIATION"], 125.00, "depr chair"),
-                C(ACCOUNTS["FURNITURE"], 125.00, "depr chair"),
+                D(ACCOUNTS["DEPRECIATION"], "125.00", "depr chair"),
+                C(ACCOUNTS["FURNITURE"], "125.00", "depr chair"),
             ],
-        )
-    )
+        ),
+    ]
+
+    # Journal and date are the same for every entry: build that part once
+    base_payload = {"journal": args.journal, "tx_date": day.isoformat()}
+    created = asyncio.run(load(args, base_payload, entries))
 
     print(f"Created {len(created)} transactions successfully.")
     for t in created: